@@ -0,0 +1,132 @@
+"""Run the bot as several processes, each owning a contiguous range of shards
+
+Usage (from src/bot): ``python cluster.py [--clusters N] [--shards M]``
+
+Each worker runs ``main.py`` with SHARD_COUNT, SHARD_IDS, CLUSTER_ID and
+CLUSTER_COUNT set, plus a distinct ID_WORKER_ID for the ID generator.
+Crashed workers are restarted with a backoff.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+from utils.config import config
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - cluster - %(levelname)s - %(message)s')
+logger = logging.getLogger("cluster")
+
+MAX_RESTART_DELAY = 60
+
+# A worker that stays up this long is healthy again and restarts from the shortest delay
+HEALTHY_UPTIME = 300
+
+def recommended_shards(token: str) -> int:
+    """Ask Discord how many shards the bot should run"""
+    request = urllib.request.Request(
+        "https://discord.com/api/v10/gateway/bot",
+        headers={"Authorization": f"Bot {token}", "User-Agent": "DiscordBot (cluster launcher)"}
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)["shards"]
+
+def shard_ranges(shard_count: int, cluster_count: int) -> List[List[int]]:
+    """Split shard IDs into contiguous, near-equal ranges"""
+    base, extra = divmod(shard_count, cluster_count)
+    ranges, start = [], 0
+    for cluster in range(cluster_count):
+        size = base + (1 if cluster < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return [shards for shards in ranges if shards]
+
+def spawn(cluster_id: int, shard_ids: List[int], shard_count: int, cluster_count: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "CLUSTER_ID": str(cluster_id),
+        "CLUSTER_COUNT": str(cluster_count),
+        "SHARD_COUNT": str(shard_count),
+        "SHARD_IDS": ",".join(map(str, shard_ids)),
+        "ID_WORKER_ID": str(cluster_id),
+    })
+    logger.info(f"Starting cluster {cluster_id} with shards {shard_ids[0]}-{shard_ids[-1]}")
+    return subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")], env=env)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the bot as multiple shard clusters")
+    parser.add_argument("--clusters", type=int, default=config.CLUSTER_COUNT, help="Number of worker processes")
+    parser.add_argument("--shards", type=int, default=config.SHARD_COUNT, help="Total shards (0 asks Discord)")
+    args = parser.parse_args()
+    
+    shard_count = args.shards or recommended_shards(config.DISCORD_TOKEN)
+    ranges = shard_ranges(shard_count, max(args.clusters, 1))
+    cluster_count = len(ranges)
+    logger.info(f"Running {shard_count} shards across {cluster_count} clusters")
+    
+    if cluster_count > 1 and "memory" in (config.LEADERBOARD_BACKEND, config.COOLDOWN_BACKEND):
+        logger.warning("In-memory leaderboard or cooldown backends are per process; use 'redis' when clustering")
+    
+    workers: Dict[int, subprocess.Popen] = {
+        cluster_id: spawn(cluster_id, shards, shard_count, cluster_count)
+        for cluster_id, shards in enumerate(ranges)
+    }
+    restarts: Dict[int, int] = {cluster_id: 0 for cluster_id in workers}
+    started_at: Dict[int, float] = {cluster_id: time.monotonic() for cluster_id in workers}
+    next_restart_at: Dict[int, float] = {}
+    
+    stopping = False
+    
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in workers.values():
+            process.terminate()
+    
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    
+    # Backoffs are deadlines checked each tick, so one crashing worker never stalls the others
+    while not stopping:
+        time.sleep(1)
+        now = time.monotonic()
+        for cluster_id, process in list(workers.items()):
+            if stopping:
+                break
+            
+            if cluster_id in next_restart_at:
+                if now >= next_restart_at[cluster_id]:
+                    del next_restart_at[cluster_id]
+                    workers[cluster_id] = spawn(cluster_id, ranges[cluster_id], shard_count, cluster_count)
+                    started_at[cluster_id] = now
+                continue
+            
+            code = process.poll()
+            if code is None:
+                if restarts[cluster_id] and now - started_at[cluster_id] >= HEALTHY_UPTIME:
+                    restarts[cluster_id] = 0
+                continue
+            
+            restarts[cluster_id] += 1
+            delay = min(2 ** restarts[cluster_id], MAX_RESTART_DELAY)
+            logger.error(f"Cluster {cluster_id} exited with {code}, restarting in {delay}s")
+            next_restart_at[cluster_id] = now + delay
+    
+    # A signal can land while a worker is being respawned; make sure it is stopped too
+    for process in workers.values():
+        if process.poll() is None:
+            process.terminate()
+    
+    for process in workers.values():
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import yt_dlp
 import asyncio
 
 class Music(commands.Cog):
@@ -30,7 +29,15 @@ class Music(commands.Cog):
             'options': '-vn'
         }
         
-        self.ytdl = yt_dlp.YoutubeDL(self.ytdl_format_options)
+        # yt_dlp is heavy to import, so it is loaded on the first /play
+        self.ytdl = None
+    
+    def get_ytdl(self):
+        """Import yt_dlp and build the downloader on first use"""
+        if self.ytdl is None:
+            import yt_dlp
+            self.ytdl = yt_dlp.YoutubeDL(self.ytdl_format_options)
+        return self.ytdl
     
     @app_commands.command(name="play", description="Play music from YouTube")
     @app_commands.describe(query="Song name or YouTube URL")
@@ -57,7 +64,7 @@ class Music(commands.Cog):
             
             # Extract video info
             data = await self.bot.loop.run_in_executor(
-                None, lambda: self.ytdl.extract_info(query, download=False)
+                None, lambda: self.get_ytdl().extract_info(query, download=False)
             )
             
             if 'entries' in data:
@@ -0,0 +1,123 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+import discord
+
+from ...utils.config import config
+from ...utils.ratelimit import TokenBucket
+from ...models.ticket_models import Ticket
+
+logger = logging.getLogger(__name__)
+
+# channel.history() fetches this many messages per request
+HISTORY_PAGE_SIZE = 100
+
+def _serialize_message(message: discord.Message) -> Dict[str, Any]:
+    return {
+        "id": str(message.id),
+        "authorId": str(message.author.id),
+        "author": str(message.author),
+        "bot": message.author.bot,
+        "content": message.content,
+        "createdAt": message.created_at.isoformat(),
+        "attachments": [attachment.url for attachment in message.attachments],
+        "embeds": [embed.to_dict() for embed in message.embeds],
+    }
+
+async def write_transcript(
+    channel: discord.TextChannel,
+    ticket_id: str,
+    budget: Optional[TokenBucket] = None
+) -> Tuple[str, int]:
+    """Stream a channel's history into a gzip JSONL transcript, one page at a time
+    
+    Only the current page is held in memory; each page is compressed and
+    written off the event loop before the next one is fetched. Returns the
+    transcript path and the number of messages written.
+    """
+    os.makedirs(config.TRANSCRIPT_PATH, exist_ok=True)
+    # Unique per attempt, so a failed or losing close only ever removes its own file
+    path = os.path.join(config.TRANSCRIPT_PATH, f"{ticket_id}-{uuid.uuid4().hex[:8]}.jsonl.gz")
+    partial_path = f"{path}.part"
+    
+    count = 0
+    page = []
+    fh = await asyncio.to_thread(gzip.open, partial_path, "wt", encoding="utf-8")
+    try:
+        if budget:
+            await budget.acquire()
+        async for message in channel.history(limit=None, oldest_first=True):
+            page.append(json.dumps(_serialize_message(message), ensure_ascii=False) + "\n")
+            count += 1
+            if len(page) == HISTORY_PAGE_SIZE:
+                await asyncio.to_thread(fh.writelines, page)
+                page = []
+                # The next iteration triggers another history request
+                if budget:
+                    await budget.acquire()
+        if page:
+            await asyncio.to_thread(fh.writelines, page)
+    except BaseException:
+        await asyncio.to_thread(fh.close)
+        await asyncio.to_thread(os.remove, partial_path)
+        raise
+    
+    await asyncio.to_thread(fh.close)
+    await asyncio.to_thread(os.replace, partial_path, path)
+    return path, count
+
+async def archive_ticket(
+    bot,
+    ticket: Ticket,
+    closed_by: int,
+    budget: Optional[TokenBucket] = None
+) -> Tuple[Optional[str], int]:
+    """Save a ticket's transcript, mark it closed and delete its channel
+    
+    The ticket is first claimed as Closing, so concurrent closes from other
+    staff, /tickets closestale or another process skip it. The channel is
+    only deleted once the transcript is on disk and the ticket is marked
+    closed; a failure part way releases the claim so the close can be retried.
+    """
+    ticket_id = ticket.ticket_id
+    if ticket.status == "Closed":
+        logger.info(f"Ticket {ticket_id} is already closed, skipping archive")
+        return None, 0
+    
+    previous_status = await bot.ticket_manager.claim_close(ticket_id)
+    if previous_status is None:
+        logger.info(f"Ticket {ticket_id} is already closed or being closed, skipping archive")
+        return None, 0
+    
+    channel = bot.get_channel(ticket.channel_id)
+    
+    path, count = None, 0
+    try:
+        if channel is not None:
+            path, count = await write_transcript(channel, ticket_id, budget)
+    except BaseException:
+        await bot.ticket_manager.release_close(ticket_id, previous_status)
+        raise
+    
+    if not await bot.ticket_registry.close(ticket_id, closed_by, path):
+        # Closed elsewhere in the meantime; keep the first close's transcript
+        if path is not None:
+            await asyncio.to_thread(os.remove, path)
+        logger.info(f"Ticket {ticket_id} was already closed, discarded the new transcript")
+        return None, 0
+    
+    if channel is not None:
+        if budget:
+            await budget.acquire()
+        try:
+            await channel.delete(reason=f"Ticket {ticket_id} closed")
+        except discord.NotFound:
+            pass
+    
+    logger.info(f"Archived ticket {ticket_id} ({count} messages) to {path}")
+    return path, count
\ No newline at end of file
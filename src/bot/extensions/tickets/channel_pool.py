@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+import discord
+
+from ...utils.config import config
+
+logger = logging.getLogger(__name__)
+
+# Name and topic given to idle pool channels so they can be re-adopted after a restart
+POOL_CHANNEL_NAME = "ticket-pool"
+POOL_CHANNEL_TOPIC = "Reserved ticket channel"
+
+class TicketChannelPool:
+    """Warm pool of hidden, pre-created channels in the ticket category
+    
+    Opening a ticket claims an idle channel and only renames it and replaces
+    its overwrites, keeping channel creation (and its rate limit) off the
+    modal submit path. A background task refills the pool one channel at a
+    time. When the pool is disabled or empty, channels are created directly.
+    """
+    
+    def __init__(self, bot, size: int, refill_delay: float = 2.0):
+        self.bot = bot
+        self.size = size
+        self.refill_delay = refill_delay
+        self._channels: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        
+        # Metrics
+        self.claims = 0
+        self.fallbacks = 0
+        self.claim_latency: deque = deque(maxlen=200)
+        self.create_latency: deque = deque(maxlen=200)
+    
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+    
+    @property
+    def depth(self) -> int:
+        return len(self._channels)
+    
+    def start(self):
+        """Start the background refill task"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    def close(self):
+        """Stop refilling; idle channels stay in place for the next start"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    def discard(self, channel_id: int):
+        """Forget a pool channel that was deleted out from under the pool"""
+        try:
+            self._channels.remove(channel_id)
+            self._wakeup.set()
+        except ValueError:
+            pass
+    
+    def _category(self) -> Optional[discord.CategoryChannel]:
+        category = self.bot.get_channel(config.TICKET_CATEGORY)
+        return category if isinstance(category, discord.CategoryChannel) else None
+    
+    def _adopt(self, category: discord.CategoryChannel):
+        """Reclaim idle pool channels left over from a previous run"""
+        for channel in category.text_channels:
+            if channel.name == POOL_CHANNEL_NAME and channel.topic == POOL_CHANNEL_TOPIC and channel.id not in self._channels:
+                self._channels.append(channel.id)
+    
+    async def _create(self, category: discord.CategoryChannel):
+        guild = category.guild
+        channel = await guild.create_text_channel(
+            name=POOL_CHANNEL_NAME,
+            category=category,
+            topic=POOL_CHANNEL_TOPIC,
+            overwrites={guild.default_role: discord.PermissionOverwrite(view_channel=False)}
+        )
+        self._channels.append(channel.id)
+    
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        
+        category = self._category()
+        if category is None:
+            logger.warning(f"Ticket category {config.TICKET_CATEGORY} not found, channel pool disabled")
+            return
+        
+        self._adopt(category)
+        logger.info(f"Ticket channel pool adopted {self.depth} idle channels")
+        
+        while True:
+            self._wakeup.clear()
+            while self.depth < self.size:
+                try:
+                    await self._create(category)
+                except discord.HTTPException as e:
+                    logger.error(f"Ticket pool refill failed: {e}")
+                    await asyncio.sleep(self.refill_delay * 10)
+                    continue
+                # Pace refills so a burst of claims doesn't hammer the channel-create route
+                await asyncio.sleep(self.refill_delay)
+            await self._wakeup.wait()
+    
+    async def _claim(self, guild: discord.Guild, name: str, overwrites: Dict) -> Optional[discord.TextChannel]:
+        while self._channels:
+            channel = guild.get_channel(self._channels.popleft())
+            if channel is None:
+                continue
+            
+            try:
+                await channel.edit(name=name, topic=None, overwrites=overwrites)
+                return channel
+            except discord.NotFound:
+                continue
+            except discord.HTTPException as e:
+                logger.error(f"Failed to claim pool channel {channel.id}: {e}")
+                return None
+        return None
+    
+    async def open(self, guild: discord.Guild, name: str, overwrites: Dict) -> discord.TextChannel:
+        """Get a ticket channel, from the pool when possible"""
+        start = time.perf_counter()
+        
+        category = self._category()
+        
+        if self.enabled and category is not None and category.guild.id == guild.id:
+            channel = await self._claim(guild, name, overwrites)
+            self._wakeup.set()
+            if channel is not None:
+                self.claims += 1
+                self.claim_latency.append(time.perf_counter() - start)
+                return channel
+            self.fallbacks += 1
+        
+        channel = await guild.create_text_channel(
+            name=name,
+            category=category,
+            overwrites=overwrites
+        )
+        self.create_latency.append(time.perf_counter() - start)
+        return channel
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool depth, claim counts and latency percentiles in milliseconds"""
+        def percentile(samples, q: float) -> Optional[float]:
+            if not samples:
+                return None
+            ordered = sorted(samples)
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+        
+        return {
+            "enabled": self.enabled,
+            "depth": self.depth,
+            "size": self.size,
+            "claims": self.claims,
+            "fallbacks": self.fallbacks,
+            "claim_p50_ms": percentile(self.claim_latency, 0.5),
+            "claim_p95_ms": percentile(self.claim_latency, 0.95),
+            "create_p50_ms": percentile(self.create_latency, 0.5),
+            "create_p95_ms": percentile(self.create_latency, 0.95),
+        }
\ No newline at end of file
@@ -3,6 +3,7 @@ from discord.ext import commands
 from discord import ui
 
 from ...utils.config import config
+from .archive import archive_ticket
 
 class CommonTicketHandlers:
     """Common handlers for both shop and midman tickets"""
@@ -10,39 +11,15 @@ class CommonTicketHandlers:
     def __init__(self, bot):
         self.bot = bot
     
-    async def handle_common_interactions(self, interaction: discord.Interaction) -> bool:
-        """Handle common ticket interactions"""
-        if not interaction.data or 'custom_id' not in interaction.data:
-            return False
-            
-        custom_id = interaction.data['custom_id']
-        
-        # Payment button handler
-        if custom_id.startswith('pay_button_'):
-            await self.handle_payment_button(interaction, custom_id)
-            return True
-            
-        # Close ticket handler
-        elif custom_id.startswith('close_ticket_'):
-            await self.handle_close_ticket(interaction, custom_id)
-            return True
-            
-        return False
+    def register_routes(self, router):
+        """Register routes shared by shop and midman tickets"""
+        router.add("pay_button_", self.handle_payment_button, ticket_id=str, staff_name=str, amount=float)
+        router.add("close_ticket_", self.handle_close_ticket, ticket_id=str)
         
-    async def handle_payment_button(self, interaction: discord.Interaction, custom_id: str):
+    async def handle_payment_button(self, interaction: discord.Interaction, ticket_id: str, staff_name: str, amount: float):
         """Handle payment buttons"""
-        parts = custom_id.replace('pay_button_', '').split('_')
-        if len(parts) < 3:
-            await interaction.response.send_message(
-                f"{config.EMOJIS['warning']} Invalid payment button.",
-                ephemeral=True
-            )
-            return
-            
-        ticket_id, staff_name, amount = parts[0], parts[1], parts[2]
-        
         # Get staff details
-        staff = config.STAFF_PAYMENTS.get(staff_name)
+        staff = self.bot.staff_directory.get(interaction.guild.id, staff_name)
         if not staff:
             await interaction.response.send_message(
                 f"{config.EMOJIS['warning']} Staff payment details not found.",
@@ -84,8 +61,9 @@ class CommonTicketHandlers:
                 color=0x00ff00
             )
             
-            if staff.get('qr_code'):
-                embed.set_image(url=staff['qr_code'])
+            qr_url = await self.bot.staff_directory.qr_url(interaction.guild.id, staff_name)
+            if qr_url:
+                embed.set_image(url=qr_url)
                 
             embed.set_footer(text="Send receipt after payment")
             
@@ -99,7 +77,7 @@ class CommonTicketHandlers:
                 custom_id=f"qr_code_{ticket_id}",
                 label="View QR Code",
                 style=discord.ButtonStyle.secondary,
-                disabled=not staff.get('qr_code')
+                disabled=not qr_url
             )
             
             view = discord.ui.View()
@@ -108,15 +86,13 @@ class CommonTicketHandlers:
             
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
             
-    async def handle_close_ticket(self, interaction: discord.Interaction, custom_id: str):
+    async def handle_close_ticket(self, interaction: discord.Interaction, ticket_id: str):
         """Handle ticket closing"""
-        ticket_id = custom_id.replace('close_ticket_', '')
-        
         await interaction.response.defer(ephemeral=True)
         
         try:
             # Get ticket from database
-            ticket = await self.bot.ticket_manager.get_ticket(ticket_id)
+            ticket = await self.bot.ticket_registry.get(ticket_id)
             
             if not ticket:
                 await interaction.followup.send(
@@ -125,18 +101,22 @@ class CommonTicketHandlers:
                 )
                 return
             
-            # Delete channel and ticket
-            channel = interaction.guild.get_channel(ticket["channelId"])
-            if channel:
-                await channel.delete()
-            
-            await self.bot.ticket_manager.delete_ticket(ticket_id)
-            
+            # Confirm now; the channel is deleted once the transcript is saved
             await interaction.followup.send(
-                f"{config.EMOJIS['verify']} Ticket closed successfully.",
+                f"{config.EMOJIS['verify']} Saving transcript and closing ticket...",
                 ephemeral=True
             )
             
+            transcript, message_count = await archive_ticket(self.bot, ticket, interaction.user.id)
+            
+            log_embed = discord.Embed(
+                title="Ticket Closed",
+                description=f"{interaction.user.mention} closed ticket `{ticket_id}`",
+                color=0xFF5252
+            )
+            log_embed.add_field(name="Transcript", value=f"{message_count} messages" if transcript else "No channel")
+            self.bot.log_dispatcher.enqueue(config.ORDERLOGS_CHANNEL, log_embed)
+            
         except Exception as e:
             await interaction.followup.send(
                 f"{config.EMOJIS['warning']} Failed to close ticket: {str(e)}",
@@ -1,14 +1,176 @@
 import discord
 from discord.ext import commands
-from discord import app_commands
+from discord import app_commands, ui
+import asyncio
+from datetime import datetime, timedelta, timezone
 
 from ...utils.config import config
+from ...utils.ratelimit import TokenBucket
+from ...utils.staff_directory import STAFF_NAME_PATTERN
+from .channel_pool import TicketChannelPool
+from .archive import archive_ticket
+from .router import ComponentRouter
+from .common_handlers import CommonTicketHandlers
+from .shop_tickets import ShopTicketHandler, ShopTicketModal
+from .midman_tickets import MidmanTicketHandler, MidmanTicketModal
+
+class TicketPanelView(ui.View):
+    """Persistent ticket panel; registered at startup so old panels keep working"""
+    
+    def __init__(self):
+        super().__init__(timeout=None)
+    
+    @ui.button(custom_id="create_ticket", label="Shop", style=discord.ButtonStyle.primary, emoji=config.EMOJIS["cart"])
+    async def create_ticket(self, interaction: discord.Interaction, button: ui.Button):
+        await interaction.response.send_modal(ShopTicketModal())
+    
+    @ui.button(custom_id="create_mm_ticket", label="Midman", style=discord.ButtonStyle.secondary, emoji=config.EMOJIS["alert"])
+    async def create_mm_ticket(self, interaction: discord.Interaction, button: ui.Button):
+        await interaction.response.send_modal(MidmanTicketModal())
+
+class TicketListView(ui.View):
+    """Keyset-paged ticket listing; each page resumes from the last ticket shown"""
+    
+    PAGE_SIZE = 10
+    
+    def __init__(self, bot, status: str, ticket_type: str = None, staff_name: str = None):
+        super().__init__(timeout=300)
+        self.bot = bot
+        self.status = status
+        self.ticket_type = ticket_type
+        self.staff_name = staff_name
+        self.cursor = None
+        self.page = 0
+    
+    async def load_page(self) -> discord.Embed:
+        """Fetch the next page and render it"""
+        tickets, self.cursor = await self.bot.ticket_manager.list_tickets(
+            status=self.status,
+            ticket_type=self.ticket_type,
+            staff_name=self.staff_name,
+            limit=self.PAGE_SIZE,
+            cursor=self.cursor
+        )
+        self.page += 1
+        self.next_page.disabled = self.cursor is None
+        
+        filters = [self.status] + [value for value in (self.ticket_type, self.staff_name) if value]
+        embed = discord.Embed(
+            title=f"Tickets ({', '.join(filters)})",
+            color=0x0099ff
+        )
+        if not tickets:
+            embed.description = f"{config.EMOJIS['verify']} No matching tickets."
+        for ticket in tickets:
+            channel = f"<#{ticket.channel_id}>" if ticket.channel_id and ticket.status != "Closed" else "closed"
+            embed.add_field(
+                name=f"{config.EMOJIS['dot']} {ticket.ticket_id} ({ticket.type})",
+                value=(
+                    f"<@{ticket.user_id}> in {channel}\n"
+                    f"Staff: {ticket.staff_name or 'unassigned'}\n"
+                    f"Opened: <t:{int(ticket.created_at.replace(tzinfo=timezone.utc).timestamp())}:R>"
+                ),
+                inline=False
+            )
+        embed.set_footer(text=f"Page {self.page}, oldest first")
+        return embed
+    
+    @ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: ui.Button):
+        embed = await self.load_page()
+        await interaction.response.edit_message(embed=embed, view=self)
 
 class TicketSystem(commands.Cog):
     """Complete ticket system with shop and midman support"""
     
+    tickets_group = app_commands.Group(
+        name="tickets",
+        description="Ticket system administration",
+        default_permissions=discord.Permissions(manage_channels=True)
+    )
+    
+    staffpay_group = app_commands.Group(
+        name="staffpay",
+        description="Manage staff payment details",
+        default_permissions=discord.Permissions(administrator=True)
+    )
+    
     def __init__(self, bot):
         self.bot = bot
+        self.channel_pool = TicketChannelPool(
+            bot,
+            size=config.TICKET_POOL_SIZE,
+            refill_delay=config.TICKET_POOL_REFILL_SECONDS
+        )
+        bot.ticket_channel_pool = self.channel_pool
+        
+        self.router = ComponentRouter()
+        for handler in (CommonTicketHandlers(bot), ShopTicketHandler(bot), MidmanTicketHandler(bot)):
+            handler.register_routes(self.router)
+    
+    async def cog_load(self):
+        """Index members of guilds that were already cached when the cog loaded"""
+        for guild in self.bot.guilds:
+            if guild.chunked:
+                await self.bot.member_index.build(guild)
+        self.bot.add_view(TicketPanelView())
+        self.channel_pool.start()
+    
+    async def cog_unload(self):
+        self.channel_pool.close()
+    
+    # === Component routing ===
+    
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        await self.router.dispatch(interaction)
+    
+    # === Member index maintenance ===
+    
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        if not guild.chunked:
+            await guild.chunk()
+        await self.bot.member_index.build(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        await guild.chunk()
+        await self.bot.member_index.build(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.bot.member_index.drop(guild.id)
+    
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.bot.member_index.add(member)
+    
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.nick != after.nick or before.name != after.name:
+            self.bot.member_index.add(after)
+    
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        # Username and global name changes arrive once per user, not per guild
+        if before.name == after.name and before.global_name == after.global_name:
+            return
+        for guild in after.mutual_guilds:
+            member = guild.get_member(after.id)
+            if member:
+                self.bot.member_index.add(member)
+    
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        self.bot.member_index.remove(payload.guild_id, payload.user.id)
+    
+    # === Ticket registry maintenance ===
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.bot.ticket_registry.evict_channel(channel.id)
+        self.channel_pool.discard(channel.id)
         
     @app_commands.command(name="setup", description="Sets up the ticket system in the current channel")
     @app_commands.default_permissions(administrator=True)
@@ -31,25 +193,7 @@ class TicketSystem(commands.Cog):
         embed.set_thumbnail(url="https://media.discordapp.net/attachments/1395695208511049798/1396755756920999999/dm4uz3-foekoe.gif")
         embed.set_footer(text="Koala Staff")
         
-        ticket_button = discord.ui.Button(
-            custom_id="create_ticket",
-            label="Shop",
-            style=discord.ButtonStyle.primary,
-            emoji=config.EMOJIS["cart"]
-        )
-        
-        mm_button = discord.ui.Button(
-            custom_id="create_mm_ticket", 
-            label="Midman",
-            style=discord.ButtonStyle.secondary,
-            emoji=config.EMOJIS["alert"]
-        )
-        
-        view = discord.ui.View()
-        view.add_item(ticket_button)
-        view.add_item(mm_button)
-        
-        await interaction.channel.send(embed=embed, view=view)
+        await interaction.channel.send(embed=embed, view=TicketPanelView())
         await interaction.followup.send(
             f"{config.EMOJIS['verify']} Ticket system successfully set up!",
             ephemeral=True
@@ -81,6 +225,252 @@ class TicketSystem(commands.Cog):
                 f"{config.EMOJIS['warning']} Failed to add member: {str(e)}",
                 ephemeral=True
             )
+    
+    @tickets_group.command(name="pool", description="Show ticket channel pool depth and claim latency")
+    async def tickets_pool(self, interaction: discord.Interaction):
+        """Ticket channel pool metrics command"""
+        stats = self.channel_pool.stats()
+        
+        def fmt_ms(value):
+            return f"{value:.0f}ms" if value is not None else "n/a"
+        
+        embed = discord.Embed(
+            title="Ticket Channel Pool",
+            color=0x0099ff if stats["enabled"] else 0x808080
+        )
+        embed.add_field(name="Depth", value=f"{stats['depth']}/{stats['size']}" if stats["enabled"] else "Disabled")
+        embed.add_field(name="Claims", value=str(stats["claims"]))
+        embed.add_field(name="Fallbacks", value=str(stats["fallbacks"]))
+        embed.add_field(
+            name="Claim Latency",
+            value=f"p50 {fmt_ms(stats['claim_p50_ms'])} / p95 {fmt_ms(stats['claim_p95_ms'])}",
+            inline=False
+        )
+        embed.add_field(
+            name="Create Latency",
+            value=f"p50 {fmt_ms(stats['create_p50_ms'])} / p95 {fmt_ms(stats['create_p95_ms'])}",
+            inline=False
+        )
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @tickets_group.command(name="queue", description="Show open ticket queues by type and staff member")
+    async def tickets_queue(self, interaction: discord.Interaction):
+        """Ticket queue overview command"""
+        stats = self.bot.ticket_registry.queue_stats()
+        
+        def fmt_age(seconds: float) -> str:
+            hours, remainder = divmod(int(seconds), 3600)
+            return f"{hours}h {remainder // 60}m" if hours else f"{remainder // 60}m"
+        
+        embed = discord.Embed(
+            title="Ticket Queues",
+            color=0x0099ff,
+            timestamp=stats["generated_at"]
+        )
+        
+        if not stats["types"]:
+            embed.description = f"{config.EMOJIS['verify']} No open tickets."
+        
+        for ticket_type, queue in sorted(stats["types"].items()):
+            embed.add_field(
+                name=f"{config.EMOJIS['dot']} {ticket_type.upper()} ({queue['depth']} open)",
+                value=(
+                    f"Median age: {fmt_age(queue['p50_age'])}\n"
+                    f"P90 age: {fmt_age(queue['p90_age'])}\n"
+                    f"Oldest: {fmt_age(queue['oldest_age'])}"
+                ),
+                inline=True
+            )
+        
+        if stats["staff"]:
+            embed.add_field(
+                name="Assigned Staff",
+                value="\n".join(f"{name}: {count}" for name, count in list(stats["staff"].items())[:10]),
+                inline=False
+            )
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @tickets_group.command(name="list", description="List tickets by status, type or assigned staff, oldest first")
+    @app_commands.describe(
+        status="Ticket status",
+        ticket_type="Only this ticket type",
+        staff="Only tickets assigned to this staff name"
+    )
+    @app_commands.choices(
+        status=[app_commands.Choice(name=name, value=name) for name in ("Pending", "Closed")],
+        ticket_type=[app_commands.Choice(name="Shop", value="shop"), app_commands.Choice(name="Midman", value="mm")]
+    )
+    async def tickets_list(
+        self,
+        interaction: discord.Interaction,
+        status: str = "Pending",
+        ticket_type: str = None,
+        staff: str = None
+    ):
+        """Paged ticket listing command"""
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            view = TicketListView(self.bot, status, ticket_type, staff)
+            embed = await view.load_page()
+            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+        except Exception as e:
+            print(f"Ticket list error: {e}")
+            await interaction.followup.send(
+                f"{config.EMOJIS['warning']} Failed to list tickets: {str(e)}",
+                ephemeral=True
+            )
+    
+    @tickets_group.command(name="closestale", description="Archive and close every ticket older than the given age")
+    @app_commands.describe(hours="Close tickets opened more than this many hours ago")
+    async def tickets_closestale(self, interaction: discord.Interaction, hours: app_commands.Range[int, 1, 720] = None):
+        """Bulk stale ticket archival command"""
+        await interaction.response.defer(ephemeral=True)
+        
+        hours = hours or config.TICKET_STALE_HOURS
+        stale = [
+            ticket for ticket in self.bot.ticket_registry.stale(datetime.utcnow() - timedelta(hours=hours))
+            if ticket.status != "Closed"
+        ]
+        if not stale:
+            await interaction.followup.send(
+                f"{config.EMOJIS['verify']} No tickets older than {hours}h.",
+                ephemeral=True
+            )
+            return
+        
+        # Every history page and channel delete draws from one shared request budget
+        budget = TokenBucket(config.TICKET_ARCHIVE_REQUESTS_PER_SECOND, 1.0)
+        semaphore = asyncio.Semaphore(config.TICKET_ARCHIVE_CONCURRENCY)
+        
+        async def archive(ticket):
+            async with semaphore:
+                return await archive_ticket(self.bot, ticket, interaction.user.id, budget)
+        
+        started = datetime.utcnow()
+        results = await asyncio.gather(*(archive(ticket) for ticket in stale), return_exceptions=True)
+        
+        failed = [(ticket.ticket_id, result) for ticket, result in zip(stale, results) if isinstance(result, Exception)]
+        for ticket_id, error in failed:
+            print(f"Stale ticket archive error ({ticket_id}): {error}")
+        
+        closed = len(stale) - len(failed)
+        messages = sum(result[1] for result in results if not isinstance(result, Exception))
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        
+        embed = discord.Embed(
+            title="Stale Tickets Closed",
+            description=f"Closed {closed}/{len(stale)} tickets older than {hours}h in {elapsed:.1f}s",
+            color=0xFF5252 if failed else 0x00ff00
+        )
+        embed.add_field(name="Messages Archived", value=str(messages))
+        if failed:
+            embed.add_field(
+                name="Failed",
+                value="\n".join(f"`{ticket_id}`" for ticket_id, _ in failed[:10]),
+                inline=False
+            )
+        
+        await interaction.followup.send(embed=embed, ephemeral=True)
+        
+        log_embed = embed.copy()
+        log_embed.description = f"{interaction.user.mention} closed {closed}/{len(stale)} tickets older than {hours}h"
+        self.bot.log_dispatcher.enqueue(config.ORDERLOGS_CHANNEL, log_embed)
+    
+    @staffpay_group.command(name="set", description="Add or update a staff member's payment details")
+    @app_commands.describe(
+        name="Staff name shown on payment buttons",
+        number="Payment number",
+        gcash_name="Account holder name",
+        qr="QR code image (kept from before if omitted)"
+    )
+    async def staffpay_set(
+        self,
+        interaction: discord.Interaction,
+        name: str,
+        number: str,
+        gcash_name: str,
+        qr: discord.Attachment = None
+    ):
+        """Staff payment update command"""
+        # The name is embedded in button custom_ids and used as a document key
+        if not STAFF_NAME_PATTERN.fullmatch(name):
+            await interaction.response.send_message(
+                f"{config.EMOJIS['warning']} Staff names may only contain letters, numbers and dashes.",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            qr_message = None
+            if qr is not None:
+                storage = self.bot.get_channel(config.STAFF_QR_CHANNEL)
+                if storage is None:
+                    await interaction.followup.send(
+                        f"{config.EMOJIS['warning']} STAFF_QR_CHANNEL is not configured, can't store QR codes.",
+                        ephemeral=True
+                    )
+                    return
+                # Upload once; payment embeds reuse the stored attachment URL
+                qr_message = await storage.send(content=f"QR code for {name}", file=await qr.to_file())
+            
+            await self.bot.staff_directory.set_staff(interaction.guild.id, name, number, gcash_name, qr_message)
+            
+            await interaction.followup.send(
+                f"{config.EMOJIS['verify']} Payment details for **{name}** saved.",
+                ephemeral=True
+            )
+            
+        except Exception as e:
+            print(f"Staff payment update error: {e}")
+            await interaction.followup.send(
+                f"{config.EMOJIS['warning']} Failed to save payment details: {str(e)}",
+                ephemeral=True
+            )
+    
+    @staffpay_group.command(name="remove", description="Remove a staff member's payment details")
+    async def staffpay_remove(self, interaction: discord.Interaction, name: str):
+        """Staff payment removal command"""
+        # Only names already in the directory reach the database update
+        directory = self.bot.staff_directory
+        if name not in directory.names(interaction.guild.id):
+            await interaction.response.send_message(
+                f"{config.EMOJIS['warning']} **{name}** is not in the payment directory.",
+                ephemeral=True
+            )
+            return
+        
+        removed = await directory.remove_staff(interaction.guild.id, name)
+        
+        if removed:
+            message = f"{config.EMOJIS['verify']} Removed payment details for **{name}**."
+        else:
+            message = f"{config.EMOJIS['warning']} **{name}** is not in the payment directory."
+        await interaction.response.send_message(message, ephemeral=True)
+    
+    @staffpay_group.command(name="list", description="List staff payment details")
+    async def staffpay_list(self, interaction: discord.Interaction):
+        """Staff payment listing command"""
+        directory = self.bot.staff_directory
+        names = directory.names(interaction.guild.id)
+        
+        embed = discord.Embed(title="Staff Payment Directory", color=0x00ff00)
+        if not names:
+            embed.description = "No staff payment details configured."
+        
+        for name in names[:25]:
+            staff = directory.get(interaction.guild.id, name)
+            embed.add_field(
+                name=name,
+                value=f"{staff['number']}\n{staff['gcash_name']}\nQR: {'Yes' if staff.get('qr_code') else 'No'}",
+                inline=True
+            )
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
 async def setup(bot):
     await bot.add_cog(TicketSystem(bot))
\ No newline at end of file
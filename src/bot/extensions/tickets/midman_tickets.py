@@ -2,11 +2,13 @@ import discord
 from discord.ext import commands
 from discord import app_commands, ui
 from datetime import datetime
-import random
+from functools import partial
 import re
 
 from ...utils.config import config
+from ...utils.ids import ids
 from ...models.ticket_models import Ticket
+from .pipeline import TicketOpenPipeline, TicketOpenError
 
 class MidmanTicketModal(ui.Modal, title='Create Midman Ticket'):
     """Modal for creating midman tickets"""
@@ -53,14 +55,18 @@ class MidmanTicketModal(ui.Modal, title='Create Midman Ticket'):
             return
         
         # Find transact partner
-        transact_user = await self.find_member(interaction.guild, self.transact_partner.value)
+        transact_user = await self.find_member(
+            interaction.guild,
+            self.transact_partner.value,
+            interaction.client.member_index
+        )
         manual_add_required = False
         
         if not transact_user:
             manual_add_required = True
             
         # Create ticket
-        ticket_id = f"MM-{random.randint(100000, 999999)}"
+        ticket_id = ids.next_ticket_id("mm")
         member = interaction.user
         
         # Create channel with permissions
@@ -78,15 +84,23 @@ class MidmanTicketModal(ui.Modal, title='Create Midman Ticket'):
                 view_channel=True, send_messages=True, read_message_history=True
             )
             
-        category_channel = interaction.guild.get_channel(config.TICKET_CATEGORY)
-        
-        channel = await interaction.guild.create_text_channel(
-            name=f"mm-ticket-{member.display_name}",
-            category=category_channel,
-            overwrites=overwrites
-        )
+        pipeline = TicketOpenPipeline(ticket_id, "mm")
+        try:
+            channel = await pipeline.open_channel(
+                interaction.client.ticket_channel_pool,
+                interaction.guild,
+                name=f"mm-ticket-{member.display_name}",
+                overwrites=overwrites
+            )
+        except TicketOpenError as e:
+            print(f"Midman ticket error: {e}")
+            await interaction.followup.send(
+                f"{config.EMOJIS['warning']} Failed to create your MM ticket. Please try again.",
+                ephemeral=True
+            )
+            return
         
-        # Create ticket in database
+        # Build ticket record
         ticket = Ticket(
             ticket_id=ticket_id,
             user_id=member.id,
@@ -100,8 +114,6 @@ class MidmanTicketModal(ui.Modal, title='Create Midman Ticket'):
             transact_partner=transact_user.id if transact_user else None
         )
         
-        await interaction.client.ticket_manager.create_ticket(ticket.to_dict())
-        
         # Send initial message
         embed = discord.Embed(
             title="Midman Ticket",
@@ -140,17 +152,19 @@ class MidmanTicketModal(ui.Modal, title='Create Midman Ticket'):
             content += f" {transact_user.mention}"
         content += f" <@&{config.MM_SUPPORT_ROLE}>"
         
-        await channel.send(content=content, embed=embed)
+        messages = [partial(channel.send, content=content, embed=embed)]
         
         # Notify if manual add required
         if manual_add_required:
-            await channel.send(
+            messages.append(partial(
+                channel.send,
                 f"{config.EMOJIS['warning']} Can't add the transact partner. Let the Midman handler add it manually using /ticket add."
-            )
+            ))
         elif transact_user:
-            await channel.send(
+            messages.append(partial(
+                channel.send,
                 f"{config.EMOJIS['verify']} Transact partner {transact_user.mention} added to the ticket."
-            )
+            ))
             
         # Send click button for payment
         click_button = discord.ui.Button(
@@ -163,49 +177,65 @@ class MidmanTicketModal(ui.Modal, title='Create Midman Ticket'):
         view = discord.ui.View()
         view.add_item(click_button)
         
-        await channel.send(
+        messages.append(pipeline.after_write(partial(
+            channel.send,
             content=f"<@&{config.MM_SUPPORT_ROLE}> Please click the Button to send your payment details.",
             view=view
-        )
+        )))
         
-        await interaction.followup.send(
+        # Store the ticket while the opening messages go out
+        try:
+            await pipeline.commit(
+                interaction.client.ticket_registry.create(ticket),
+                messages,
+                rollback=pipeline.discard(interaction.client.ticket_registry, channel)
+            )
+        except TicketOpenError as e:
+            print(f"Midman ticket error: {e}")
+            await interaction.followup.send(
+                f"{config.EMOJIS['warning']} Failed to create your MM ticket. Please try again.",
+                ephemeral=True
+            )
+            return
+        
+        await pipeline.timed("followup", interaction.followup.send(
             f"{config.EMOJIS['verify']} MM ticket created: {channel.mention}",
             ephemeral=True
+        ))
+        pipeline.report()
+        
+        log_embed = discord.Embed(
+            title="Midman Ticket Opened",
+            description=f"{member.mention} opened {channel.mention}",
+            color=0x0099ff,
+            timestamp=datetime.utcnow()
         )
+        log_embed.add_field(name="Ticket ID", value=f"`{ticket_id}`")
+        log_embed.add_field(name="Amount", value=f"₱{amount}")
+        log_embed.add_field(name="Partner", value=transact_user.mention if transact_user else "Not added yet")
+        interaction.client.log_dispatcher.enqueue(config.ORDERLOGS_CHANNEL, log_embed)
     
-    async def find_member(self, guild, search_term: str) -> discord.Member:
-        """Find member by mention, ID, or username"""
-        # Check if mention
+    async def find_member(self, guild, search_term: str, member_index) -> discord.Member:
+        """Find member by mention, ID, or username using the local member index"""
+        search_term = search_term.strip()
+        
+        # Check if mention or user ID
+        user_id = search_term
         if search_term.startswith('<@') and search_term.endswith('>'):
             user_id = search_term.replace('<@', '').replace('>', '').replace('!', '')
+            
+        if re.match(r'^\d+$', user_id):
+            member = guild.get_member(int(user_id))
+            if member or guild.chunked:
+                return member
             try:
                 return await guild.fetch_member(int(user_id))
-            except:
+            except discord.HTTPException:
                 return None
                 
-        # Check if user ID
-        if re.match(r'^\d+$', search_term):
-            try:
-                return await guild.fetch_member(int(search_term))
-            except:
-                return None
-                
-        # Search by username
-        search_term = search_term.lower().strip()
-        async for member in guild.fetch_members(limit=None):
-            if (member.name.lower() == search_term or 
-                member.display_name.lower() == search_term or
-                str(member).lower() == search_term):
-                return member
-                
-        # Fuzzy search
-        async for member in guild.fetch_members(limit=None):
-            if (search_term in member.name.lower() or 
-                search_term in member.display_name.lower()):
-                return member
-                
-        return None
-
+        # Search by username, display name or tag, then by partial name
+        return member_index.find(guild, search_term)
+    
 class MidmanStaffModal(ui.Modal, title='Midman Payment Details'):
     """Modal for midman staff payment details"""
     
@@ -231,9 +261,9 @@ class MidmanStaffModal(ui.Modal, title='Midman Payment Details'):
         await interaction.response.defer(ephemeral=True)
         
         # Validate staff name
-        if self.staff_name.value.strip() not in config.STAFF_PAYMENTS:
+        if interaction.client.staff_directory.get(interaction.guild.id, self.staff_name.value.strip()) is None:
             await interaction.followup.send(
-                f"{config.EMOJIS['warning']} Staff name not found in configuration.",
+                f"{config.EMOJIS['warning']} Staff name not found in the payment directory.",
                 ephemeral=True
             )
             return
@@ -254,33 +284,29 @@ class MidmanStaffModal(ui.Modal, title='Midman Payment Details'):
             )
             return
             
-        # Get ticket and update
-        ticket = await interaction.client.ticket_manager.get_ticket(self.ticket_id)
+        # Get ticket, then update it while the payment embed goes out
+        registry = interaction.client.ticket_registry
+        ticket = await registry.get(self.ticket_id)
         if ticket:
-            await interaction.client.ticket_manager.update_ticket(
-                self.ticket_id,
-                {
-                    "staffName": self.staff_name.value.strip(),
-                    "amount": amount
-                }
-            )
+            staff_name = self.staff_name.value.strip()
+            previous = {"staffName": ticket.staff_name, "amount": ticket.amount}
+            messages = []
             
             # Send payment embed to ticket channel
-            channel = interaction.guild.get_channel(ticket["channelId"])
+            channel = interaction.guild.get_channel(ticket.channel_id)
             if channel:
-                staff = config.STAFF_PAYMENTS[self.staff_name.value.strip()]
-                
                 embed = discord.Embed(
                     title="MIDMAN PAYMENT",
                     description="Please click the 'Pay' button to pay your midman order",
                     color=0x00ff00
                 )
                 
-                if staff.get("qr_code"):
-                    embed.set_image(url=staff["qr_code"])
+                qr_url = await interaction.client.staff_directory.qr_url(interaction.guild.id, staff_name)
+                if qr_url:
+                    embed.set_image(url=qr_url)
                 
                 pay_button = discord.ui.Button(
-                    custom_id=f"pay_button_{self.ticket_id}_{self.staff_name.value.strip()}_{amount}",
+                    custom_id=f"pay_button_{self.ticket_id}_{staff_name}_{amount}",
                     label=f"Pay {amount}",
                     style=discord.ButtonStyle.success,
                     emoji=config.EMOJIS["verify"]
@@ -289,15 +315,39 @@ class MidmanStaffModal(ui.Modal, title='Midman Payment Details'):
                 view = discord.ui.View()
                 view.add_item(pay_button)
                 
-                content = f"<@{ticket['userId']}>"
-                if ticket.get("transactPartner"):
-                    content += f" <@{ticket['transactPartner']}>"
+                content = f"<@{ticket.user_id}>"
+                if ticket.transact_partner:
+                    content += f" <@{ticket.transact_partner}>"
                 
-                await channel.send(
+                messages.append(TicketOpenPipeline.after_write(partial(
+                    channel.send,
                     content=content,
                     embed=embed,
                     view=view
+                )))
+            
+            pipeline = TicketOpenPipeline(self.ticket_id, "mm payment")
+            
+            async def rollback():
+                for message in pipeline.sent:
+                    await message.delete()
+                await registry.update(self.ticket_id, previous)
+            
+            try:
+                await pipeline.commit(
+                    registry.update(self.ticket_id, {"staffName": staff_name, "amount": amount}),
+                    messages,
+                    rollback=rollback
+                )
+            except TicketOpenError as e:
+                print(f"Midman payment error: {e}")
+                await interaction.followup.send(
+                    f"{config.EMOJIS['warning']} Failed to send payment details. Please try again.",
+                    ephemeral=True
                 )
+                return
+            
+            pipeline.report()
         
         await interaction.followup.send(
             f"{config.EMOJIS['verify']} Payment details sent successfully!",
@@ -310,30 +360,12 @@ class MidmanTicketHandler:
     def __init__(self, bot):
         self.bot = bot
     
-    async def handle_midman_interaction(self, interaction: discord.Interaction) -> bool:
-        """Handle midman ticket interactions"""
-        if not interaction.data or 'custom_id' not in interaction.data:
-            return False
-            
-        custom_id = interaction.data['custom_id']
-        
-        # Midman ticket creation button
-        if custom_id == 'create_mm_ticket':
-            modal = MidmanTicketModal()
-            await interaction.response.send_modal(modal)
-            return True
-            
-        # Handle click button for payment details
-        elif custom_id.startswith('click_button_'):
-            await self.handle_click_button(interaction, custom_id)
-            return True
-            
-        return False
+    def register_routes(self, router):
+        """Register midman ticket button routes"""
+        router.add("click_button_", self.handle_click_button, ticket_id=str)
         
-    async def handle_click_button(self, interaction: discord.Interaction, custom_id: str):
+    async def handle_click_button(self, interaction: discord.Interaction, ticket_id: str):
         """Handle click button in midman tickets"""
-        ticket_id = custom_id.replace('click_button_', '')
-        
         # Check if user is MM support
         if not any(role.id == config.MM_SUPPORT_ROLE for role in interaction.user.roles):
             await interaction.response.send_message(
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+class TicketOpenError(Exception):
+    """One or more ticket setup stages failed; carries every stage error"""
+    
+    def __init__(self, ticket_id: str, errors: List[Tuple[str, Exception]]):
+        self.ticket_id = ticket_id
+        self.errors = errors
+        details = "; ".join(f"{stage}: {error!r}" for stage, error in errors)
+        super().__init__(f"Ticket {ticket_id} setup failed ({details})")
+
+class TicketOpenPipeline:
+    """Run ticket setup stages concurrently and record how long each one took
+    
+    The database write and the channel message chain are independent once the
+    channel exists, so they run side by side. Messages within the chain are
+    still sent in order, and ones with buttons wait for the record. If any stage fails, the caller's rollback runs and
+    every error is raised together as a TicketOpenError.
+    """
+    
+    def __init__(self, ticket_id: str, kind: str):
+        self.ticket_id = ticket_id
+        self.kind = kind
+        self.timings: Dict[str, float] = {}
+        self.sent: List[discord.Message] = []
+        self._start = time.perf_counter()
+    
+    async def timed(self, stage: str, awaitable: Awaitable):
+        """Await one stage and record its duration"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.timings[stage] = time.perf_counter() - start
+    
+    async def open_channel(self, pool, guild: discord.Guild, name: str, overwrites: Dict) -> discord.TextChannel:
+        """Get the ticket channel from the pool, failing the pipeline if that is impossible"""
+        try:
+            return await self.timed("channel", pool.open(guild, name=name, overwrites=overwrites))
+        except discord.HTTPException as e:
+            self.report(failed=True)
+            raise TicketOpenError(self.ticket_id, [("channel", e)]) from e
+    
+    def discard(self, registry, channel: discord.TextChannel) -> Callable[[], Awaitable]:
+        """Rollback for a failed open: drop the ticket record, then its channel
+        
+        The record goes first so a channel that cannot be deleted never leaves
+        an open ticket pointing at it. Each step runs even if the other fails.
+        """
+        async def rollback():
+            errors = []
+            try:
+                await registry.delete(self.ticket_id)
+            except Exception as e:
+                logger.error(f"Ticket {self.ticket_id}: failed to delete record during rollback: {e}")
+                errors.append(e)
+            try:
+                await channel.delete(reason=f"Ticket {self.ticket_id} setup failed")
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                logger.error(f"Ticket {self.ticket_id}: failed to delete channel {channel.id} during rollback: {e}")
+                errors.append(e)
+            if errors:
+                raise errors[0]
+        return rollback
+    
+    @staticmethod
+    def after_write(send: Callable[[], Awaitable]) -> Callable[[], Awaitable]:
+        """Mark a message that must wait for the database write
+        
+        Use this for messages carrying buttons whose handlers look the ticket
+        up, so a fast click never lands before the record exists.
+        """
+        async def gated(stored: asyncio.Future):
+            await asyncio.wait([stored])
+            if stored.exception() is not None:
+                return None
+            return await send()
+        gated.after_write = True
+        return gated
+    
+    async def _send_chain(self, messages: Sequence[Callable[[], Awaitable]], stored: asyncio.Future):
+        for send in messages:
+            if getattr(send, "after_write", False):
+                message = await send(stored)
+            else:
+                message = await send()
+            if message is not None:
+                self.sent.append(message)
+    
+    async def commit(
+        self,
+        write: Awaitable,
+        messages: Sequence[Callable[[], Awaitable]],
+        rollback: Optional[Callable[[], Awaitable]] = None
+    ):
+        """Run the database write alongside the ordered message chain
+        
+        Messages wrapped with after_write hold back until the write finishes
+        and are skipped if it failed.
+        """
+        stored = asyncio.ensure_future(self.timed("db", write))
+        results = await asyncio.gather(
+            stored,
+            self.timed("messages", self._send_chain(messages, stored)),
+            return_exceptions=True
+        )
+        
+        errors = [
+            (stage, result) for stage, result in zip(("db", "messages"), results)
+            if isinstance(result, Exception)
+        ]
+        if not errors:
+            return
+        
+        if rollback is not None:
+            try:
+                await self.timed("rollback", rollback())
+            except Exception as e:
+                errors.append(("rollback", e))
+        
+        self.report(failed=True)
+        raise TicketOpenError(self.ticket_id, errors)
+    
+    def report(self, failed: bool = False):
+        """Log total and per-stage latency for this ticket"""
+        total = (time.perf_counter() - self._start) * 1000
+        stages = ", ".join(f"{stage} {seconds * 1000:.0f}ms" for stage, seconds in self.timings.items())
+        outcome = "failed" if failed else "opened"
+        logger.info(f"{self.kind} ticket {self.ticket_id} {outcome} in {total:.0f}ms ({stages})")
\ No newline at end of file
@@ -0,0 +1,117 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import discord
+
+from ...utils.config import config
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[..., Awaitable[None]]
+
+class Route:
+    """A custom_id prefix bound to a handler and a typed payload layout
+    
+    The rest of the custom_id after the prefix is split on '_' into the
+    declared fields, left to right; only the last field may itself contain
+    '_'. A route without fields matches its prefix exactly.
+    """
+    
+    __slots__ = ("prefix", "handler", "fields")
+    
+    def __init__(self, prefix: str, handler: Handler, fields: Tuple[Tuple[str, type], ...]):
+        self.prefix = prefix
+        self.handler = handler
+        self.fields = fields
+    
+    def decode(self, payload: str) -> Dict[str, Any]:
+        """Convert the payload into typed handler keyword arguments"""
+        if not self.fields:
+            if payload:
+                raise ValueError(f"Unexpected payload for {self.prefix!r}")
+            return {}
+        
+        parts = payload.split("_", len(self.fields) - 1)
+        if len(parts) != len(self.fields) or not all(parts):
+            raise ValueError(f"Expected {len(self.fields)} fields for {self.prefix!r}, got {payload!r}")
+        return {name: kind(part) for (name, kind), part in zip(self.fields, parts)}
+
+class ComponentRouter:
+    """Dispatch component interactions to handlers by custom_id prefix
+    
+    Routes are stored in a character trie, so finding the longest registered
+    prefix costs O(len(custom_id)) however many routes exist. Because routing
+    only depends on the custom_id, buttons keep working across restarts.
+    """
+    
+    def __init__(self):
+        self._root: Dict[Optional[str], Any] = {}
+        self.routes: Dict[str, Route] = {}
+    
+    def add(self, prefix: str, handler: Handler, **fields: type):
+        """Register a handler for custom_ids starting with prefix"""
+        if prefix in self.routes:
+            raise ValueError(f"Route {prefix!r} is already registered")
+        
+        route = Route(prefix, handler, tuple(fields.items()))
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        # None never collides with a character key
+        node[None] = route
+        self.routes[prefix] = route
+    
+    def match(self, custom_id: str) -> Optional[Tuple[Route, str]]:
+        """Find the route with the longest prefix of custom_id and the payload after it"""
+        node = self._root
+        best = node.get(None)
+        for char in custom_id:
+            node = node.get(char)
+            if node is None:
+                break
+            best = node.get(None, best)
+        
+        if best is None:
+            return None
+        return best, custom_id[len(best.prefix):]
+    
+    async def dispatch(self, interaction: discord.Interaction) -> bool:
+        """Run the handler for a component interaction; False if no route matches"""
+        if interaction.type != discord.InteractionType.component or not interaction.data:
+            return False
+        
+        custom_id = interaction.data.get("custom_id", "")
+        matched = self.match(custom_id)
+        if matched is None:
+            return False
+        
+        route, payload = matched
+        try:
+            kwargs = route.decode(payload)
+        except ValueError as e:
+            logger.warning(f"Undecodable component {custom_id!r}: {e}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message(
+                    f"{config.EMOJIS['warning']} This button is no longer valid.",
+                    ephemeral=True
+                )
+            return True
+        
+        try:
+            await route.handler(interaction, **kwargs)
+        except Exception as e:
+            print(f"Component handler error ({custom_id}): {e}")
+            await self._report_failure(interaction)
+        return True
+    
+    @staticmethod
+    async def _report_failure(interaction: discord.Interaction):
+        """Tell the user their click failed instead of leaving it unanswered"""
+        message = f"{config.EMOJIS['warning']} An error occurred. Please try again."
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send(message, ephemeral=True)
+            else:
+                await interaction.response.send_message(message, ephemeral=True)
+        except discord.HTTPException:
+            pass
\ No newline at end of file
@@ -2,10 +2,13 @@ import discord
 from discord.ext import commands
 from discord import app_commands, ui
 from datetime import datetime
-import random
+from functools import partial
 
 from ...utils.config import config
+from ...utils.ids import ids
 from ...models.ticket_models import Ticket
+from .pipeline import TicketOpenPipeline, TicketOpenError
+from .archive import archive_ticket
 
 class ShopTicketModal(ui.Modal, title='Create Support Ticket'):
     """Modal for creating shop tickets"""
@@ -62,7 +65,7 @@ class ShopTicketModal(ui.Modal, title='Create Support Ticket'):
         guild = interaction.guild
         member = interaction.user
         
-        ticket_id = f"T-{random.randint(100000, 999999)}"
+        ticket_id = ids.next_ticket_id("shop")
         
         # Create channel
         overwrites = {
@@ -73,15 +76,23 @@ class ShopTicketModal(ui.Modal, title='Create Support Ticket'):
             )
         }
         
-        category_channel = guild.get_channel(config.TICKET_CATEGORY)
-        
-        channel = await guild.create_text_channel(
-            name=f"ticket-{member.display_name}",
-            category=category_channel,
-            overwrites=overwrites
-        )
+        pipeline = TicketOpenPipeline(ticket_id, "shop")
+        try:
+            channel = await pipeline.open_channel(
+                interaction.client.ticket_channel_pool,
+                guild,
+                name=f"ticket-{member.display_name}",
+                overwrites=overwrites
+            )
+        except TicketOpenError as e:
+            print(f"Shop ticket error: {e}")
+            await interaction.followup.send(
+                f"{config.EMOJIS['warning']} Failed to create your ticket. Please try again.",
+                ephemeral=True
+            )
+            return
         
-        # Create ticket in database
+        # Build ticket record
         ticket = Ticket(
             ticket_id=ticket_id,
             user_id=member.id,
@@ -93,8 +104,6 @@ class ShopTicketModal(ui.Modal, title='Create Support Ticket'):
             notes=self.notes.value or "None provided"
         )
         
-        await interaction.client.ticket_manager.create_ticket(ticket.to_dict())
-        
         # Send initial ticket message
         embed = discord.Embed(
             title="Order Ticket",
@@ -152,16 +161,43 @@ class ShopTicketModal(ui.Modal, title='Create Support Ticket'):
         view.add_item(yes_button)
         view.add_item(no_button)
         
-        await channel.send(
-            content=f"{member.mention} <@&{config.SUPPORT_ROLE}>",
-            embed=embed,
-            view=view
-        )
+        # Store the ticket while the opening message goes out
+        try:
+            await pipeline.commit(
+                interaction.client.ticket_registry.create(ticket),
+                [
+                    pipeline.after_write(partial(
+                        channel.send,
+                        content=f"{member.mention} <@&{config.SUPPORT_ROLE}>",
+                        embed=embed,
+                        view=view
+                    ))
+                ],
+                rollback=pipeline.discard(interaction.client.ticket_registry, channel)
+            )
+        except TicketOpenError as e:
+            print(f"Shop ticket error: {e}")
+            await interaction.followup.send(
+                f"{config.EMOJIS['warning']} Failed to create your ticket. Please try again.",
+                ephemeral=True
+            )
+            return
         
-        await interaction.followup.send(
+        await pipeline.timed("followup", interaction.followup.send(
             f"{config.EMOJIS['verify']} Ticket created: {channel.mention}",
             ephemeral=True
+        ))
+        pipeline.report()
+        
+        log_embed = discord.Embed(
+            title="Shop Ticket Opened",
+            description=f"{member.mention} opened {channel.mention}",
+            color=0x0099ff,
+            timestamp=datetime.utcnow()
         )
+        log_embed.add_field(name="Ticket ID", value=f"`{ticket_id}`")
+        log_embed.add_field(name="Order", value=f"{self.order.value} x{quantity}")
+        interaction.client.log_dispatcher.enqueue(config.ORDERLOGS_CHANNEL, log_embed)
 
 class ShopTicketHandler:
     """Shop ticket interaction handler"""
@@ -169,34 +205,13 @@ class ShopTicketHandler:
     def __init__(self, bot):
         self.bot = bot
     
-    async def handle_shop_interaction(self, interaction: discord.Interaction) -> bool:
-        """Handle shop ticket interactions"""
-        if not interaction.data or 'custom_id' not in interaction.data:
-            return False
-            
-        custom_id = interaction.data['custom_id']
+    def register_routes(self, router):
+        """Register shop ticket button routes"""
+        router.add("yes_button_", self.handle_yes_button, ticket_id=str)
+        router.add("no_button_", self.handle_no_button, ticket_id=str)
         
-        # Shop ticket creation button
-        if custom_id == 'create_ticket':
-            modal = ShopTicketModal()
-            await interaction.response.send_modal(modal)
-            return True
-            
-        # Handle other shop ticket interactions
-        if custom_id.startswith('yes_button_'):
-            await self.handle_yes_button(interaction, custom_id)
-            return True
-            
-        elif custom_id.startswith('no_button_'):
-            await self.handle_no_button(interaction, custom_id)
-            return True
-            
-        return False
-        
-    async def handle_yes_button(self, interaction: discord.Interaction, custom_id: str):
+    async def handle_yes_button(self, interaction: discord.Interaction, ticket_id: str):
         """Handle yes button in shop tickets"""
-        ticket_id = custom_id.replace('yes_button_', '')
-        
         # Disable original buttons
         original_view = discord.ui.View()
         for item in interaction.message.components[0].children:
@@ -229,22 +244,37 @@ class ShopTicketHandler:
             ephemeral=True
         )
         
-    async def handle_no_button(self, interaction: discord.Interaction, custom_id: str):
+    async def handle_no_button(self, interaction: discord.Interaction, ticket_id: str):
         """Handle no button in shop tickets"""
-        ticket_id = custom_id.replace('no_button_', '')
+        await interaction.response.defer(ephemeral=True)
         
         try:
-            # Delete ticket channel
-            await interaction.channel.delete()
-            await self.bot.ticket_manager.delete_ticket(ticket_id)
+            ticket = await self.bot.ticket_registry.get(ticket_id)
+            if not ticket:
+                await interaction.followup.send(
+                    f"{config.EMOJIS['warning']} Ticket not found.",
+                    ephemeral=True
+                )
+                return
             
-            await interaction.response.send_message(
-                f"{config.EMOJIS['verify']} Ticket cancelled and deleted.",
+            await interaction.followup.send(
+                f"{config.EMOJIS['verify']} Ticket cancelled, closing channel...",
                 ephemeral=True
             )
             
+            # Keep the record and transcript instead of deleting them
+            await archive_ticket(self.bot, ticket, interaction.user.id)
+            
+            log_embed = discord.Embed(
+                title="Shop Ticket Cancelled",
+                description=f"{interaction.user.mention} cancelled ticket `{ticket_id}`",
+                color=0xFF5252,
+                timestamp=datetime.utcnow()
+            )
+            self.bot.log_dispatcher.enqueue(config.ORDERLOGS_CHANNEL, log_embed)
+            
         except Exception as e:
-            await interaction.response.send_message(
-                f"{config.EMOJIS['warning']} Failed to delete ticket: {str(e)}",
+            await interaction.followup.send(
+                f"{config.EMOJIS['warning']} Failed to close ticket: {str(e)}",
                 ephemeral=True
             )
\ No newline at end of file
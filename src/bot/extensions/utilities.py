@@ -38,6 +38,8 @@ class Utilities(commands.Cog):
     async def botinfo(self, interaction: discord.Interaction):
         """Bot information command"""
         
+        stats = await self.bot.cluster_stats()
+        
         embed = discord.Embed(
             title="🤖 Bot Information",
             color=0x7289da
@@ -45,12 +47,59 @@ class Utilities(commands.Cog):
         
         embed.add_field(name="Python Version", value=platform.python_version(), inline=True)
         embed.add_field(name="discord.py Version", value=discord.__version__, inline=True)
-        embed.add_field(name="Servers", value=len(self.bot.guilds), inline=True)
+        embed.add_field(name="Servers", value=stats["guilds"], inline=True)
+        embed.add_field(name="Shards", value=f"{stats['shards']} across {stats['clusters']} cluster(s)", inline=True)
         embed.add_field(name="Uptime", value="Online", inline=True)
         embed.add_field(name="Developer", value="Your Name", inline=True)
         
         await interaction.response.send_message(embed=embed)
     
+    @app_commands.command(name="metrics", description="Show latency and rate limit metrics")
+    @app_commands.default_permissions(administrator=True)
+    async def metrics(self, interaction: discord.Interaction):
+        """Metrics summary command"""
+        
+        summary = self.bot.metrics.summary()
+        
+        def ms(seconds):
+            if seconds is None:
+                return "n/a"
+            return "inf" if seconds == float("inf") else f"{seconds * 1000:.0f}ms"
+        
+        embed = discord.Embed(
+            title="📈 Metrics",
+            color=0x7289da
+        )
+        
+        lag_p50, lag_p99 = summary["loop_lag"]
+        embed.add_field(name="Event Loop Lag", value=f"p50 ≤ {ms(lag_p50)}\np99 ≤ {ms(lag_p99)}", inline=True)
+        
+        heartbeat = "\n".join(f"Shard {shard}: {ms(latency)}" for shard, latency in sorted(summary["heartbeat"].items()))
+        embed.add_field(name="Heartbeat", value=heartbeat or "n/a", inline=True)
+        
+        limits = summary["rate_limits"]
+        embed.add_field(
+            name="Rate Limits (429)",
+            value=f"Route: {limits.get('route', 0)}\nGlobal: {limits.get('global', 0)}\nLogs dropped: {summary['log_dropped']}",
+            inline=True
+        )
+        
+        commands_text = "\n".join(
+            f"`/{labels['command']}` {labels['status']}: {count} (p50 ≤ {ms(p50)}, p95 ≤ {ms(p95)})"
+            for labels, count, p50, p95 in summary["commands"]
+        )
+        embed.add_field(name="Commands", value=commands_text or "No commands yet", inline=False)
+        
+        mongo_text = "\n".join(
+            f"`{labels['command']}` {labels['status']}: {count} (p50 ≤ {ms(p50)}, p95 ≤ {ms(p95)})"
+            for labels, count, p50, p95 in summary["mongo"]
+        )
+        embed.add_field(name="MongoDB", value=mongo_text or "No operations yet", inline=False)
+        
+        embed.set_footer(text=f"Messages processed: {self.bot.messages_processed}")
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
     @app_commands.command(name="userinfo", description="Display user information")
     @app_commands.describe(user="User to get information about (optional)")
     async def userinfo(self, interaction: discord.Interaction, user: discord.Member = None):
@@ -1,40 +1,103 @@
 import discord
 from discord.ext import commands
-from discord import app_commands
+from discord import app_commands, ui
 import asyncio
+import os
 from datetime import datetime, timedelta
-from typing import Optional
 
 from ...utils.config import config
+from ...utils.ratelimit import create_cooldown, format_remaining
+from ...models.vouch_import import read_vouch_file, normalize_vouch, format_report
 
-class VouchCooldown:
-    """Cooldown management for vouch commands"""
+class VouchHistoryView(ui.View):
+    """Keyset-paginated vouch history browser"""
     
-    def __init__(self):
-        self.cooldowns = {}
+    def __init__(self, bot, owner_id: int, user: discord.User, page_size: int = 10):
+        super().__init__(timeout=300)
+        self.bot = bot
+        self.owner_id = owner_id
+        self.user = user
+        self.page_size = page_size
+        self.page_number = 1
+        self.cursors = [None]
+        self.next_cursor = None
     
-    def is_on_cooldown(self, user_id: int, command: str, cooldown_seconds: int = 2) -> Optional[int]:
-        """Check if user is on cooldown for a command"""
-        if command not in self.cooldowns:
-            self.cooldowns[command] = {}
-            
-        now = datetime.utcnow()
-        user_cooldowns = self.cooldowns[command]
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only the user who opened the history can page through it"""
+        return interaction.user.id == self.owner_id
+    
+    async def build_embed(self) -> discord.Embed:
+        """Fetch the current page and render it"""
+        vouches, self.next_cursor = await self.bot.vouch_manager.get_user_vouches_page(
+            self.user.id,
+            limit=self.page_size,
+            cursor=self.cursors[-1]
+        )
+        
+        embed = discord.Embed(
+            title=f"{config.EMOJIS['pin']} Vouch History",
+            description=f"{config.EMOJIS['dot']} Vouches received by **{self.user.display_name}**",
+            color=0x2B7FBD
+        )
+        embed.set_thumbnail(url=self.user.display_avatar.url)
+        
+        first_number = (self.page_number - 1) * self.page_size + 1
+        for number, vouch in enumerate(vouches, start=first_number):
+            comment = vouch['message'][:80] + ('...' if len(vouch['message']) > 80 else '')
+            embed.add_field(
+                name=f"{config.EMOJIS['dot']} #{number}",
+                value=f"<@{vouch['vouchedBy']}> <t:{int(vouch['timestamp'].timestamp())}:R>\n`{comment}`",
+                inline=False
+            )
+        
+        if not vouches:
+            embed.description = f"{config.EMOJIS['alert']} {self.user.display_name} has no vouches yet."
         
-        if user_id in user_cooldowns:
-            expiration_time = user_cooldowns[user_id] + timedelta(seconds=cooldown_seconds)
-            if now < expiration_time:
-                return int((expiration_time - now).total_seconds())
+        embed.set_footer(text=f"Page {self.page_number}")
         
-        user_cooldowns[user_id] = now
-        return None
+        self.previous_page.disabled = len(self.cursors) == 1
+        self.next_page.disabled = self.next_cursor is None
+        return embed
+    
+    @ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: ui.Button):
+        self.cursors.pop()
+        self.page_number -= 1
+        embed = await self.build_embed()
+        await interaction.response.edit_message(embed=embed, view=self)
+    
+    @ui.button(label="Next", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: ui.Button):
+        self.cursors.append(self.next_cursor)
+        self.page_number += 1
+        embed = await self.build_embed()
+        await interaction.response.edit_message(embed=embed, view=self)
 
 class VouchCommands(commands.Cog):
     """Vouch system commands"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.cooldown = VouchCooldown()
+        self.command_cooldown = create_cooldown(
+            "vouch_command",
+            config.VOUCH_COMMAND_COOLDOWN_SECONDS,
+            max_keys=config.VOUCH_COOLDOWN_MAX_KEYS
+        )
+        self.pair_cooldown = create_cooldown(
+            "vouch_pair",
+            config.VOUCH_COOLDOWN_SECONDS,
+            max_keys=config.VOUCH_COOLDOWN_MAX_KEYS
+        )
+    
+    async def cog_load(self):
+        """Rebuild running per-pair cooldowns from recent vouches"""
+        now = datetime.utcnow()
+        since = now - timedelta(seconds=config.VOUCH_COOLDOWN_SECONDS)
+        
+        async for vouch in self.bot.vouch_manager.iter_vouches_since(since):
+            remaining = config.VOUCH_COOLDOWN_SECONDS - (now - vouch["timestamp"]).total_seconds()
+            if remaining > 0:
+                await self.pair_cooldown.trigger((vouch["vouchedBy"], vouch["userId"]), remaining)
         
     def is_owner(self, user_id: int) -> bool:
         """Check if user is bot owner"""
@@ -66,11 +129,11 @@ class VouchCommands(commands.Cog):
         
         # Check cooldown for non-owners
         if not self.is_owner(interaction.user.id):
-            cooldown_remaining = self.cooldown.is_on_cooldown(interaction.user.id, "vouch")
+            cooldown_remaining = await self.command_cooldown.acquire(interaction.user.id)
             if cooldown_remaining:
                 embed = discord.Embed(
                     title=f"{config.EMOJIS['wrong']} Cooldown",
-                    description=f"{config.EMOJIS['alert']} Please wait **{cooldown_remaining} seconds** before using this command again.",
+                    description=f"{config.EMOJIS['alert']} Please wait **{format_remaining(cooldown_remaining)} seconds** before using this command again.",
                     color=0xFF0000
                 )
                 await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -102,26 +165,34 @@ class VouchCommands(commands.Cog):
             await interaction.followup.send(embed=embed)
             return
         
-        # Check cooldown for specific user
+        # Check cooldown for specific user, claiming it so concurrent vouches cannot slip through
+        pair_key = (str(interaction.user.id), str(user.id))
         if not self.is_owner(interaction.user.id):
-            recent_vouch = await self.bot.vouch_manager.get_recent_vouch(user.id, interaction.user.id)
-            if recent_vouch:
-                time_since_last = (interaction.created_at - recent_vouch["timestamp"]).total_seconds()
-                if time_since_last < config.VOUCH_COOLDOWN_SECONDS:
-                    remaining = config.VOUCH_COOLDOWN_SECONDS - int(time_since_last)
-                    minutes = remaining // 60
-                    seconds = remaining % 60
-                    embed = discord.Embed(
-                        title=f"{config.EMOJIS['wrong']} Cooldown",
-                        description=f"{config.EMOJIS['alert']} Wait **{minutes}m {seconds}s** before vouching for this user again.",
-                        color=0xFF0000
-                    )
-                    await interaction.followup.send(embed=embed)
-                    return
+            pair_remaining = await self.pair_cooldown.acquire(pair_key)
+            if pair_remaining:
+                remaining = format_remaining(pair_remaining)
+                minutes = remaining // 60
+                seconds = remaining % 60
+                embed = discord.Embed(
+                    title=f"{config.EMOJIS['wrong']} Cooldown",
+                    description=f"{config.EMOJIS['alert']} Wait **{minutes}m {seconds}s** before vouching for this user again.",
+                    color=0xFF0000
+                )
+                await interaction.followup.send(embed=embed)
+                return
         
         # Create vouch
         try:
-            vouch_data = await self.bot.vouch_manager.create_vouch(user.id, interaction.user.id, vouch_message)
+            try:
+                vouch_data = await self.bot.vouch_manager.create_vouch(
+                    user.id,
+                    interaction.user.id,
+                    vouch_message,
+                    display_name=user.display_name
+                )
+            except Exception:
+                await self.pair_cooldown.reset(pair_key)
+                raise
             vouch_count = await self.bot.vouch_manager.get_vouch_count(user.id)
             
             embed = discord.Embed(
@@ -165,22 +236,20 @@ class VouchCommands(commands.Cog):
             
             await interaction.followup.send(embed=embed)
             
-            # Log to log channel
-            log_channel = self.bot.get_channel(config.VOUCH_LOG_CHANNEL)
-            if log_channel:
-                log_embed = discord.Embed(
-                    title=f"{config.EMOJIS['pin']} Vouch Success",
-                    description=f"{config.EMOJIS['dot']} Vouch for {user.display_name} by {interaction.user.display_name}",
-                    color=0x00FF00
-                )
-                log_embed.add_field(name="Comment", value=vouch_message)
-                log_embed.add_field(name="Vouch ID", value=f"`{vouch_data['vouchId']}`")
-                
-                # Add attachment if exists
-                if interaction.message.attachments:
-                    log_embed.set_image(url=interaction.message.attachments[0].url)
-                
-                await log_channel.send(embed=log_embed)
+            # Log to log channel in the background
+            log_embed = discord.Embed(
+                title=f"{config.EMOJIS['pin']} Vouch Success",
+                description=f"{config.EMOJIS['dot']} Vouch for {user.display_name} by {interaction.user.display_name}",
+                color=0x00FF00
+            )
+            log_embed.add_field(name="Comment", value=vouch_message)
+            log_embed.add_field(name="Vouch ID", value=f"`{vouch_data['vouchId']}`")
+            
+            # Add attachment if exists
+            if interaction.message.attachments:
+                log_embed.set_image(url=interaction.message.attachments[0].url)
+            
+            self.bot.log_dispatcher.enqueue(config.VOUCH_LOG_CHANNEL, log_embed)
                 
         except Exception as e:
             print(f"Vouch creation error: {e}")
@@ -204,10 +273,10 @@ class VouchCommands(commands.Cog):
         await interaction.response.defer()
         
         try:
-            vouches = await self.bot.vouch_manager.get_user_vouches(user.id)
-            vouch_count = len(vouches)
+            vouch_count = await self.bot.vouch_manager.get_vouch_count(user.id)
+            latest_vouch = await self.bot.vouch_manager.get_latest_vouch(user.id) if vouch_count else None
             
-            if vouch_count == 0:
+            if not latest_vouch:
                 embed = discord.Embed(
                     title=f"{config.EMOJIS['wrong']} No Vouches",
                     description=f"{config.EMOJIS['alert']} {user.display_name} has no vouches yet. Be the first to vouch!",
@@ -218,8 +287,6 @@ class VouchCommands(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            latest_vouch = vouches[0]
-            
             embed = discord.Embed(
                 title=f"{config.EMOJIS['pin']} 📊 Vouch Summary",
                 description=f"{config.EMOJIS['dot']} Vouch stats for **{user.display_name}**",
@@ -253,6 +320,14 @@ class VouchCommands(commands.Cog):
                 inline=False
             )
             
+            rank = await self.bot.vouch_manager.get_leaderboard_rank(user.id)
+            if rank:
+                embed.add_field(
+                    name=f"{config.EMOJIS['pin']} Leaderboard Rank",
+                    value=f"**#{rank}**",
+                    inline=True
+                )
+            
             embed.set_footer(text=f"Use /vouchhistory @{user.name} for full history")
             
             await interaction.followup.send(embed=embed)
@@ -266,6 +341,91 @@ class VouchCommands(commands.Cog):
             )
             await interaction.followup.send(embed=embed)
     
+    # === Vouch History Command ===
+    
+    @app_commands.command(name="vouchhistory", description="Browse the vouches a user has received")
+    @app_commands.describe(user="The user to show vouch history for (optional)")
+    async def vouchhistory(self, interaction: discord.Interaction, user: discord.User = None):
+        """Vouch history command"""
+        
+        if not user:
+            user = interaction.user
+        
+        await interaction.response.defer()
+        
+        try:
+            view = VouchHistoryView(self.bot, interaction.user.id, user)
+            embed = await view.build_embed()
+            await interaction.followup.send(embed=embed, view=view)
+            
+        except Exception as e:
+            print(f"Vouch history error: {e}")
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['wrong']} Fetch Failed",
+                description=f"{config.EMOJIS['alert']} Could not retrieve vouch history. Try again later.",
+                color=0xFF0000
+            )
+            await interaction.followup.send(embed=embed)
+    
+    # === Vouch Search Command ===
+    
+    @app_commands.command(name="vouchsearch", description="Search vouch comments by keyword")
+    @app_commands.describe(
+        keyword="Words to search for",
+        user="Only search vouches received by this user (optional)",
+        page="Page number (optional)"
+    )
+    async def vouchsearch(self, interaction: discord.Interaction, keyword: str, user: discord.User = None, page: int = 1):
+        """Vouch search command"""
+        
+        await interaction.response.defer()
+        
+        try:
+            items_per_page = 10
+            page = max(page, 1)
+            results = await self.bot.vouch_manager.search_vouches(
+                keyword,
+                user_id=user.id if user else None,
+                offset=(page - 1) * items_per_page,
+                limit=items_per_page
+            )
+            
+            if not results:
+                embed = discord.Embed(
+                    title=f"{config.EMOJIS['wrong']} No Results",
+                    description=f"{config.EMOJIS['alert']} No vouches match **{keyword[:100]}**.",
+                    color=0xFF5252
+                )
+                await interaction.followup.send(embed=embed)
+                return
+            
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['pin']} Vouch Search",
+                description=f"{config.EMOJIS['dot']} Results for **{keyword[:100]}**" + (f" on {user.mention}" if user else ""),
+                color=0x2B7FBD
+            )
+            
+            for number, vouch in enumerate(results, start=(page - 1) * items_per_page + 1):
+                comment = vouch['message'][:80] + ('...' if len(vouch['message']) > 80 else '')
+                embed.add_field(
+                    name=f"{config.EMOJIS['dot']} #{number}",
+                    value=f"<@{vouch['vouchedBy']}> → <@{vouch['userId']}> <t:{int(vouch['timestamp'].timestamp())}:R>\n`{comment}`",
+                    inline=False
+                )
+            
+            embed.set_footer(text=f"Page {page}")
+            
+            await interaction.followup.send(embed=embed)
+            
+        except Exception as e:
+            print(f"Vouch search error: {e}")
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['wrong']} Search Failed",
+                description=f"{config.EMOJIS['alert']} Could not search vouches. Try again later.",
+                color=0xFF0000
+            )
+            await interaction.followup.send(embed=embed)
+    
     # === Vouch Leaderboard Command ===
     
     @app_commands.command(name="vouchleaderboard", description="View vouch leaderboard")
@@ -276,7 +436,12 @@ class VouchCommands(commands.Cog):
         await interaction.response.defer()
         
         try:
-            leaderboard = await self.bot.vouch_manager.get_leaderboard(limit=50)
+            items_per_page = 10
+            page = max(page, 1)
+            start_idx = (page - 1) * items_per_page
+            
+            total_ranked = await self.bot.vouch_manager.get_leaderboard_size()
+            leaderboard = await self.bot.vouch_manager.get_leaderboard(limit=items_per_page, offset=start_idx)
             
             if not leaderboard:
                 embed = discord.Embed(
@@ -287,20 +452,21 @@ class VouchCommands(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            items_per_page = 10
-            start_idx = (page - 1) * items_per_page
-            end_idx = start_idx + items_per_page
-            
             embed = discord.Embed(
                 title=f"{config.EMOJIS['pin']} 🏆 Vouch Leaderboard",
-                description=f"{config.EMOJIS['dot']} Top **{len(leaderboard)}** most vouched users\nPage {page}/{(len(leaderboard) + items_per_page - 1) // items_per_page}",
+                description=f"{config.EMOJIS['dot']} **{total_ranked}** vouched users\nPage {page}/{(total_ranked + items_per_page - 1) // items_per_page}",
                 color=0xF1C40F
             )
             
-            for i in range(start_idx, min(end_idx, len(leaderboard))):
-                item = leaderboard[i]
-                user_obj = await self.bot.fetch_user(int(item["_id"]))
-                username = user_obj.display_name if user_obj else "Unknown"
+            # Names denormalized into the leaderboard cover most rows, resolve the rest in one wave
+            missing_ids = [item["_id"] for item in leaderboard if not item.get("name")]
+            resolved = await self.bot.user_resolver.resolve_many(missing_ids) if missing_ids else {}
+            
+            for i, item in enumerate(leaderboard, start=start_idx):
+                username = item.get("name")
+                if not username:
+                    user_obj = resolved.get(int(item["_id"]))
+                    username = user_obj.display_name if user_obj else "Unknown"
                 
                 embed.add_field(
                     name=f"#{i + 1}",
@@ -342,10 +508,13 @@ class VouchCommands(commands.Cog):
                 inline=True
             )
             
+            top_ids = [stats[key]['_id'] for key in ('top_giver', 'top_receiver') if stats[key]]
+            resolved = await self.bot.user_resolver.resolve_many(top_ids)
+            
             # Top giver
             top_giver_text = "None"
             if stats['top_giver']:
-                giver_user = await self.bot.fetch_user(int(stats['top_giver']['_id']))
+                giver_user = resolved.get(int(stats['top_giver']['_id']))
                 if giver_user:
                     top_giver_text = f"{giver_user.mention} with **{stats['top_giver']['count']}**"
             
@@ -358,7 +527,7 @@ class VouchCommands(commands.Cog):
             # Top receiver
             top_receiver_text = "None"
             if stats['top_receiver']:
-                receiver_user = await self.bot.fetch_user(int(stats['top_receiver']['_id']))
+                receiver_user = resolved.get(int(stats['top_receiver']['_id']))
                 if receiver_user:
                     top_receiver_text = f"{receiver_user.mention} with **{stats['top_receiver']['count']}**"
             
@@ -368,7 +537,17 @@ class VouchCommands(commands.Cog):
                 inline=True
             )
             
-            embed.set_footer(text="Stats as of now")
+            # Recent volume
+            week_start = (datetime.utcnow() - timedelta(days=6)).strftime('%Y-%m-%d')
+            recent_total = sum(day['count'] for day in stats['daily'] if day['_id'] >= week_start)
+            embed.add_field(
+                name=f"{config.EMOJIS['dot']} Last 7 Days",
+                value=f"**{recent_total}** vouches",
+                inline=True
+            )
+            
+            generated_at = stats['generated_at']
+            embed.set_footer(text=f"Stats as of {generated_at.strftime('%Y-%m-%d %H:%M:%S')} UTC")
             
             await interaction.followup.send(embed=embed)
             
@@ -437,6 +616,15 @@ class VouchCommands(commands.Cog):
             
             await interaction.followup.send(embed=embed)
             
+            log_embed = discord.Embed(
+                title=f"{config.EMOJIS['pin']} Vouches Given",
+                description=f"{config.EMOJIS['dot']} {interaction.user.display_name} gave **{created_count}** vouches to {user.display_name}",
+                color=0x43B581
+            )
+            log_embed.add_field(name="Comment", value=message)
+            log_embed.add_field(name="Total Now", value=str(total_count))
+            self.bot.log_dispatcher.enqueue(config.VOUCH_LOG_CHANNEL, log_embed)
+            
         except Exception as e:
             print(f"Vouch give error: {e}")
             embed = discord.Embed(
@@ -444,4 +632,97 @@ class VouchCommands(commands.Cog):
                 description=f"{config.EMOJIS['alert']} Could not add vouches.",
                 color=0xFF0000
             )
-            await interaction.followup.send(embed=embed)
\ No newline at end of file
+            await interaction.followup.send(embed=embed)
+    
+    # Vouch Import (Admin)
+    @app_commands.command(name="vouchimport", description="[ADMIN] Import vouches from a CSV/JSON export")
+    @app_commands.describe(
+        file="CSV, JSON Lines or JSON export of vouches",
+        batch_size="Vouches inserted per batch (optional)"
+    )
+    async def vouchimport(self, interaction: discord.Interaction, file: discord.Attachment, batch_size: int = 1000):
+        """Admin vouch import command"""
+        
+        if not self.is_owner(interaction.user.id):
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['wrong']} Permission Denied",
+                description=f"{config.EMOJIS['alert']} Only bot owners can use this command.",
+                color=0xFF0000
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        import_path = os.path.join(config.DATA_PATH, 'imports', f"{file.id}_{os.path.basename(file.filename)}")
+        
+        try:
+            os.makedirs(os.path.dirname(import_path), exist_ok=True)
+            await file.save(import_path)
+            
+            report = await self.bot.vouch_manager.ingest_vouches(
+                read_vouch_file(import_path),
+                batch_size=min(max(batch_size, 100), 10000),
+                normalize=normalize_vouch
+            )
+            
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['correct']} Vouches Imported",
+                description=f"{config.EMOJIS['dot']} {format_report(report)}",
+                color=0x43B581
+            )
+            embed.set_footer(text=f"Action by: {interaction.user.display_name}")
+            
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            
+        except Exception as e:
+            print(f"Vouch import error: {e}")
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['wrong']} Failed",
+                description=f"{config.EMOJIS['alert']} Could not import vouches: {str(e)[:200]}",
+                color=0xFF0000
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            
+        finally:
+            if os.path.exists(import_path):
+                os.remove(import_path)
+    
+    # Vouch Reconcile (Admin)
+    @app_commands.command(name="vouchreconcile", description="[ADMIN] Rebuild vouch counters from the raw vouches")
+    async def vouchreconcile(self, interaction: discord.Interaction):
+        """Admin vouch counter reconcile command"""
+        
+        if not self.is_owner(interaction.user.id):
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['wrong']} Permission Denied",
+                description=f"{config.EMOJIS['alert']} Only bot owners can use this command.",
+                color=0xFF0000
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            started = datetime.utcnow()
+            reconciled = await self.bot.vouch_manager.reconcile_vouch_counts()
+            elapsed = (datetime.utcnow() - started).total_seconds()
+            
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['correct']} Counters Rebuilt",
+                description=f"{config.EMOJIS['dot']} Rebuilt vouch counters for **{reconciled}** users in {elapsed:.1f}s",
+                color=0x43B581
+            )
+            embed.set_footer(text=f"Action by: {interaction.user.display_name}")
+            
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            
+        except Exception as e:
+            print(f"Vouch reconcile error: {e}")
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['wrong']} Failed",
+                description=f"{config.EMOJIS['alert']} Could not rebuild vouch counters.",
+                color=0xFF0000
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
\ No newline at end of file
@@ -1,53 +1,94 @@
 import asyncio
 import logging
-import sys
 import traceback
 from datetime import datetime
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 from utils.config import config
 from utils.security import security
 from models.database import MongoDB, VouchManager, TicketManager
+from models.leaderboard import create_leaderboard
+from models.ticket_registry import TicketRegistry
+from utils.redis_client import close_redis
+from utils.log_dispatcher import LogDispatcher
+from utils.user_cache import UserResolver
+from utils.member_index import MemberIndex
+from utils.staff_directory import StaffDirectory
+from utils.cache_profiles import get_profile, log_cache_report
+from utils.extension_loader import ExtensionLoader
+from utils.ids import claim_worker_id
+from utils.cluster_ipc import ClusterIPC
+from utils.log_setup import setup_logging
+from utils.metrics import InstrumentedCommandTree, LoopLagSampler, MetricsServer, MongoCommandListener, instrument_bot
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, config.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'{config.LOG_PATH}/bot.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Configure logging; records are written by a background thread
+log_listener = setup_logging('bot.log')
 
 logger = logging.getLogger(__name__)
+command_logger = logging.getLogger('bot.commands')
 
-class AdvancedBot(commands.Bot):
-    """Advanced Discord bot with extended functionality"""
+class AdvancedBot(commands.AutoShardedBot):
+    """Advanced Discord bot with extended functionality
+    
+    Runs every shard in one process by default. Under cluster.py each
+    process owns the shard range given by SHARD_IDS and answers
+    cross-cluster queries over Redis.
+    """
     
     def __init__(self):
-        intents = discord.Intents.all()
-        intents.typing = False
-        intents.delayed = False
+        # Intents, member cache and message cache follow the configured profile
+        profile = get_profile(config.CACHE_PROFILE)
         
         super().__init__(
             command_prefix=self.get_prefix,
-            intents=intents,
             help_command=None,
             case_insensitive=True,
-            max_messages=10000
+            tree_cls=InstrumentedCommandTree,
+            shard_count=config.SHARD_COUNT or None,
+            shard_ids=config.SHARD_IDS or None,
+            **profile.client_options()
         )
         
+        self.cache_profile = profile
+        self.cache_reported = False
         self.start_time = datetime.utcnow()
-        self.db = MongoDB(config.MONGO_URI, config.MONGO_DB)
-        self.vouch_manager = VouchManager(self.db)
+        self.db = MongoDB(config.MONGO_URI, config.MONGO_DB, event_listeners=[MongoCommandListener()])
+        self.vouch_manager = VouchManager(
+            self.db,
+            create_leaderboard(),
+            stats_ttl=config.VOUCH_STATS_TTL_SECONDS,
+            stats_top_n=config.VOUCH_STATS_TOP_N,
+            stats_days=config.VOUCH_STATS_DAYS
+        )
         self.ticket_manager = TicketManager(self.db)
+        self.ticket_registry = TicketRegistry(self.ticket_manager)
+        self.log_dispatcher = LogDispatcher(self, max_queue=config.LOG_DISPATCH_QUEUE_SIZE)
+        self.user_resolver = UserResolver(
+            self,
+            max_size=config.USER_CACHE_SIZE,
+            ttl=config.USER_CACHE_TTL_SECONDS,
+            concurrency=config.USER_FETCH_CONCURRENCY
+        )
+        self.member_index = MemberIndex()
+        self.staff_directory = StaffDirectory(self, self.db, poll_interval=config.STAFF_DIRECTORY_POLL_SECONDS)
+        self.cluster_ipc = ClusterIPC(config.CLUSTER_ID, config.CLUSTER_COUNT)
+        self.cluster_ipc.register("stats", self.local_stats)
+        # Tickets carry no guild, so every process holds them all and follows the others' writes
+        self.cluster_ipc.register("ticket_changed", self.ticket_registry.refresh)
+        self.ticket_registry.on_change = lambda ticket_id: self.cluster_ipc.publish("ticket_changed", ticket_id=ticket_id)
+        self.loop_lag = LoopLagSampler(interval=config.LOOP_LAG_INTERVAL)
+        self.metrics_server = (
+            MetricsServer(config.METRICS_HOST, config.METRICS_PORT + config.CLUSTER_ID)
+            if config.METRICS_PORT else None
+        )
         self.extensions_loaded = False
         
         # Statistics
         self.commands_used = 0
         self.messages_processed = 0
+        instrument_bot(self)
         
     async def get_prefix(self, message: discord.Message) -> str:
         """Get prefix for guild or default"""
@@ -59,49 +100,76 @@ class AdvancedBot(commands.Bot):
         """Called when bot is starting"""
         logger.info("Starting bot setup...")
         
+        await claim_worker_id()
+        
         # Initialize database
         await self.db.initialize()
         logger.info("Database initialized")
         
+        await self.vouch_manager.warm_leaderboard()
+        logger.info("Vouch leaderboard loaded")
+        
+        await self.ticket_registry.warm()
+        await self.staff_directory.load()
+        
         # Load extensions
         await self.load_extensions()
         
         # Start background tasks
         self.update_status.start()
+        self.log_dispatcher.start()
+        self.staff_directory.start()
+        self.cluster_ipc.start()
+        self.loop_lag.start()
+        if self.metrics_server is not None:
+            await self.metrics_server.start()
         
         logger.info("Bot setup completed")
     
     async def load_extensions(self):
-        """Load all bot extensions"""
-        extensions = [
-            'extensions.admin',
-            'extensions.moderation',
-            'extensions.security',
-            'extensions.music',
-            'extensions.economy',
-            'extensions.utilities',
-            'extensions.tickets',
-            'extensions.vouch'
-        ]
+        """Load the profile's extensions concurrently and log how long each took"""
+        loader = ExtensionLoader(self, list(self.cache_profile.extensions), timeout=config.EXTENSION_LOAD_TIMEOUT)
+        results = await loader.load_all()
         
-        for extension in extensions:
-            try:
-                await self.load_extension(extension)
-                logger.info(f"Loaded extension: {extension}")
-            except Exception as e:
-                logger.error(f"Failed to load extension {extension}: {e}")
-                traceback.print_exc()
+        logger.info(f"Extension startup report:\n{loader.report()}")
+        for result in results:
+            if result.status == "missing":
+                logger.warning(f"Extension {result.name} not found, skipped")
+            elif result.error is not None:
+                logger.error(f"Failed to load extension {result.name}: {result.error}")
+                traceback.print_exception(result.error)
         
         self.extensions_loaded = True
     
+    async def local_stats(self) -> dict:
+        """Counts for the shards this process owns"""
+        return {
+            "cluster": config.CLUSTER_ID,
+            "guilds": len(self.guilds),
+            "users": sum(guild.member_count or 0 for guild in self.guilds),
+            "shards": len(self.shards)
+        }
+    
+    async def cluster_stats(self) -> dict:
+        """Counts summed across every cluster that replied"""
+        replies = await self.cluster_ipc.query("stats", timeout=config.CLUSTER_IPC_TIMEOUT)
+        return {
+            "guilds": sum(reply["guilds"] for reply in replies),
+            "users": sum(reply["users"] for reply in replies),
+            "shards": sum(reply["shards"] for reply in replies),
+            "clusters": len(replies)
+        }
+    
     @commands.dm_only()
     async def on_message(self, message):
         """Handle DMs"""
         if message.author.bot:
             return
-            
-        # Log DM for debugging
-        logger.info(f"DM from {message.author}: {message.content}")
+        
+        self.messages_processed += 1
+        
+        # Log DM for debugging; the content itself is never logged
+        logger.debug("DM received", extra={"user_id": message.author.id, "length": len(message.content)})
         
         # Process commands in DMs
         await self.process_commands(message)
@@ -109,8 +177,9 @@ class AdvancedBot(commands.Bot):
     @tasks.loop(minutes=5)
     async def update_status(self):
         """Update bot status periodically"""
+        stats = await self.cluster_stats()
         activities = [
-            discord.Activity(type=discord.ActivityType.watching, name=f"{len(self.guilds)} servers"),
+            discord.Activity(type=discord.ActivityType.watching, name=f"{stats['guilds']} servers"),
             discord.Activity(type=discord.ActivityType.listening, name="/help"),
             discord.Activity(type=discord.ActivityType.playing, name="with security")
         ]
@@ -126,13 +195,32 @@ class AdvancedBot(commands.Bot):
     async def on_ready(self):
         """Called when bot is ready"""
         logger.info(f'{self.user} is now online!')
-        logger.info(f'Connected to {len(self.guilds)} guilds')
+        logger.info(f'Connected to {len(self.guilds)} guilds on shards {sorted(self.shards)} (cluster {config.CLUSTER_ID})')
         logger.info(f'Bot ID: {self.user.id}')
+        
+        # on_ready fires again after reconnects; report the warm caches once
+        if not self.cache_reported:
+            self.cache_reported = True
+            log_cache_report(self, self.cache_profile)
     
     async def on_command(self, ctx):
         """Called when a command is executed"""
         self.commands_used += 1
-        logger.info(f"Command used: {ctx.command} by {ctx.author} in {ctx.guild}")
+        # Sampled by LOG_SAMPLE_RATES
+        command_logger.info(
+            f"Command used: {ctx.command}",
+            extra={"command": str(ctx.command), "user_id": ctx.author.id, "guild_id": ctx.guild.id if ctx.guild else None}
+        )
+    
+    async def close(self):
+        """Stop background services and flush queued log embeds before disconnecting"""
+        self.cluster_ipc.close()
+        self.loop_lag.close()
+        if self.metrics_server is not None:
+            await self.metrics_server.close()
+        self.staff_directory.close()
+        await self.log_dispatcher.close()
+        await super().close()
     
     async def on_error(self, event_method: str, *args, **kwargs):
         """Global error handler"""
@@ -157,6 +245,8 @@ async def main():
     finally:
         if not bot.is_closed():
             await bot.close()
+        await close_redis()
+        log_listener.stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
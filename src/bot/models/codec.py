@@ -0,0 +1,65 @@
+from typing import Any, Dict, Mapping, Tuple, Type, TypeVar
+
+# Discord IDs are stored as strings and held as ints
+SNOWFLAKE = "snowflake"
+
+D = TypeVar("D", bound="Document")
+
+class Document:
+    """Slotted model mapped to a BSON document through a field table
+    
+    ``FIELDS`` lists (attribute, document key, kind, default). ``from_dict``
+    fills the slots directly without running ``__init__``, so stored values
+    such as creation times survive a round-trip unchanged. Models compare by
+    value and are mutable, so they are not hashable.
+    """
+    
+    __slots__ = ()
+    FIELDS: Tuple[Tuple[str, str, Any, Any], ...] = ()
+    __hash__ = None
+    
+    @classmethod
+    def projection(cls) -> Dict[str, int]:
+        """Projection fetching only the mapped fields, so unmapped ones are never sent or decoded"""
+        return {key: 1 for _, key, _, _ in cls.FIELDS}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Encode to a document for storage"""
+        document = {}
+        for attr, key, kind, _ in self.FIELDS:
+            value = getattr(self, attr)
+            if key == "_id" and value is None:
+                continue
+            if kind == SNOWFLAKE and value is not None:
+                value = str(value)
+            document[key] = value
+        return document
+    
+    @classmethod
+    def from_dict(cls: Type[D], data: Mapping[str, Any]) -> D:
+        """Decode a stored document"""
+        instance = cls.__new__(cls)
+        for attr, key, kind, default in cls.FIELDS:
+            value = data.get(key, default)
+            if kind == SNOWFLAKE and value is not None:
+                value = int(value)
+            object.__setattr__(instance, attr, value)
+        return instance
+    
+    def apply(self, update: Mapping[str, Any]):
+        """Apply a ``$set`` style update keyed by document field names"""
+        for attr, key, kind, _ in self.FIELDS:
+            if key in update:
+                value = update[key]
+                if kind == SNOWFLAKE and value is not None:
+                    value = int(value)
+                setattr(self, attr, value)
+    
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for attr, *_ in self.FIELDS)
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{attr}={getattr(self, attr)!r}" for attr, *_ in self.FIELDS[:3])
+        return f"{type(self).__name__}({fields})"
\ No newline at end of file
@@ -1,78 +1,267 @@
 import motor.motor_asyncio
-from datetime import datetime
-import uuid
-from typing import List, Dict, Any, Optional
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import islice
+import asyncio
+import time
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, AsyncIterator, Union, Callable
+
+from utils.ids import ids, TICKET_PREFIXES
+from models.ticket_models import Ticket
+from models.vouch_models import Vouch
+
+# Fields returned by the vouch history queries
+VOUCH_HISTORY_FIELDS = ("vouchedBy", "message", "timestamp", "vouchId")
+
+# Partial index over live vouches only; its first entry answers "is there any live vouch"
+LIVE_VOUCH_INDEX = [("userId", 1), ("vouchedBy", 1), ("timestamp", -1)]
 
 class MongoDB:
     """MongoDB database handler"""
     
-    def __init__(self, connection_uri: str, db_name: str):
-        self.client = motor.motor_asyncio.AsyncIOMotorClient(connection_uri)
+    def __init__(self, connection_uri: str, db_name: str, event_listeners: Optional[List[Any]] = None):
+        self.client = motor.motor_asyncio.AsyncIOMotorClient(connection_uri, event_listeners=event_listeners or [])
         self.db = self.client[db_name]
         self.vouches = self.db.vouches
         self.tickets = self.db.tickets
         self.guilds = self.db.guilds
         self.users = self.db.users
+        self.stats = self.db.stats
         
     async def initialize(self):
         """Initialize database indexes"""
         # Vouches indexes
-        await self.vouches.create_index("userId")
         await self.vouches.create_index("vouchedBy")
         await self.vouches.create_index("timestamp")
         await self.vouches.create_index("vouchId", unique=True)
         
+        # A user's vouches newest first (history pages, latest vouch, delete, transfer)
+        await self.vouches.create_index([("userId", 1), ("deleted", 1), ("timestamp", -1), ("_id", -1)])
+        
+        # Most recent live vouch between a giver and a receiver (per-pair cooldown)
+        await self.vouches.create_index(LIVE_VOUCH_INDEX, partialFilterExpression={"deleted": False})
+        
+        # Ranked keyword search over live vouch messages
+        await self.vouches.create_index(
+            [("message", "text"), ("userId", 1)],
+            name="message_text",
+            partialFilterExpression={"deleted": False}
+        )
+        
         # Tickets indexes
         await self.tickets.create_index("ticketId", unique=True)
-        await self.tickets.create_index("userId")
         await self.tickets.create_index("channelId")
         await self.tickets.create_index("status")
+        await self.tickets.create_index([("userId", 1), ("createdAt", -1)])
+        await self.tickets.create_index([("userId", 1), ("type", 1), ("createdAt", -1)])
+        await self.tickets.create_index([("status", 1), ("type", 1), ("createdAt", 1), ("_id", 1)])
+        await self.tickets.create_index([("staffName", 1), ("status", 1), ("createdAt", 1), ("_id", 1)])
         
         # Guilds indexes
         await self.guilds.create_index("guildId", unique=True)
+        await self.guilds.create_index("staffPaymentsUpdatedAt", sparse=True)
         
         # Users indexes
         await self.users.create_index("userId", unique=True)
+        await self.users.create_index([("vouchCount", -1)])
     
     def generate_id(self) -> str:
-        """Generate unique ID"""
-        return str(uuid.uuid4())
+        """Generate unique, time-sortable ID"""
+        return ids.next_id()
 
 class VouchManager:
     """Vouch system database operations"""
     
-    def __init__(self, db: MongoDB):
+    def __init__(self, db: MongoDB, leaderboard=None, stats_ttl: int = 300, stats_top_n: int = 5, stats_days: int = 30):
         self.db = db
+        self.leaderboard = leaderboard
+        
+        # Stats snapshot cache
+        self.stats_ttl = stats_ttl
+        self.stats_top_n = stats_top_n
+        self.stats_days = stats_days
+        self._stats_snapshot = None
+        self._stats_expires_at = 0.0
+        self._stats_generation = 0
+        self._stats_lock = asyncio.Lock()
     
-    async def create_vouch(self, user_id: int, vouched_by: int, message: str, points: int = 1) -> Dict[str, Any]:
-        """Create a new vouch"""
-        vouch_data = {
-            "userId": str(user_id),
-            "vouchedBy": str(vouched_by),
-            "points": points,
-            "message": message,
-            "timestamp": datetime.utcnow(),
-            "deleted": False,
-            "vouchId": self.db.generate_id()
-        }
+    async def create_vouch(self, user_id: int, vouched_by: int, message: str, points: int = 1, display_name: str = None) -> Dict[str, Any]:
+        """Create a new vouch, remembering the receiver's display name for the leaderboard"""
+        vouch_data = Vouch(self.db.generate_id(), user_id, vouched_by, message, points).to_dict()
         result = await self.db.vouches.insert_one(vouch_data)
+        await self._adjust_vouch_count(user_id, 1, display_name)
         return vouch_data
     
     async def get_user_vouches(self, user_id: int, include_deleted: bool = False) -> List[Dict[str, Any]]:
         """Get all vouches for a user"""
-        query = {"userId": str(user_id)}
-        if not include_deleted:
-            query["deleted"] = False
+        # Constrain deleted either way so the userId/deleted/timestamp index serves the sort
+        query = {"userId": str(user_id), "deleted": False}
+        if include_deleted:
+            query["deleted"] = {"$in": [False, True]}
             
         cursor = self.db.vouches.find(query).sort("timestamp", -1)
         return await cursor.to_list(length=None)
     
+    async def get_user_vouches_page(
+        self,
+        user_id: int,
+        limit: int = 10,
+        cursor: Optional[Tuple[datetime, Any]] = None,
+        fields: Iterable[str] = VOUCH_HISTORY_FIELDS
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[datetime, Any]]]:
+        """Get one page of a user's vouches, newest first
+        
+        ``cursor`` is the (timestamp, _id) of the last vouch on the previous page.
+        Returns the page and the cursor for the next one, or None on the last page.
+        """
+        query = {"userId": str(user_id), "deleted": False}
+        if cursor:
+            timestamp, last_id = cursor
+            query["timestamp"] = {"$lte": timestamp}
+            query["$or"] = [{"timestamp": {"$lt": timestamp}}, {"_id": {"$lt": last_id}}]
+        
+        projection = {field: 1 for field in fields}
+        projection["timestamp"] = 1
+        
+        vouches = await self.db.vouches.find(query, projection).sort(
+            [("timestamp", -1), ("_id", -1)]
+        ).limit(limit + 1).to_list(length=limit + 1)
+        
+        if len(vouches) <= limit:
+            return vouches, None
+        
+        vouches = vouches[:limit]
+        return vouches, (vouches[-1]["timestamp"], vouches[-1]["_id"])
+    
+    async def iter_user_vouches(
+        self,
+        user_id: int,
+        batch_size: int = 500,
+        fields: Iterable[str] = VOUCH_HISTORY_FIELDS
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream every vouch a user has received, newest first, one page at a time"""
+        cursor = None
+        while True:
+            vouches, cursor = await self.get_user_vouches_page(user_id, batch_size, cursor, fields)
+            for vouch in vouches:
+                yield vouch
+            if cursor is None:
+                return
+    
+    async def get_latest_vouch(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get the most recent vouch received by a user"""
+        return await self.db.vouches.find_one(
+            {"userId": str(user_id), "deleted": False},
+            {"message": 1, "timestamp": 1, "vouchedBy": 1},
+            sort=[("timestamp", -1)]
+        )
+    
     async def get_vouch_count(self, user_id: int) -> int:
-        """Get count of vouches for a user"""
-        return await self.db.vouches.count_documents({
-            "userId": str(user_id),
-            "deleted": False
-        })
+        """Get count of vouches for a user from the materialized counter"""
+        user = await self.db.users.find_one({"userId": str(user_id)}, {"vouchCount": 1})
+        if not user:
+            return 0
+        return max(user.get("vouchCount", 0), 0)
+    
+    async def _adjust_vouch_count(self, user_id: int, delta: int, display_name: str = None) -> int:
+        """Atomically adjust the materialized vouch counter for a user"""
+        update = {"$inc": {"vouchCount": delta}}
+        if display_name:
+            update["$set"] = {"displayName": display_name}
+        
+        user = await self.db.users.find_one_and_update(
+            {"userId": str(user_id)},
+            update,
+            projection={"vouchCount": 1, "displayName": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        count = user.get("vouchCount", 0)
+        
+        self.invalidate_stats()
+        if self.leaderboard:
+            await self.leaderboard.set_score(user_id, count, user.get("displayName"))
+        return count
+    
+    async def _apply_vouch_count_deltas(self, deltas: Dict[str, int]):
+        """Adjust many materialized vouch counters in a single bulk write"""
+        deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        
+        await self.db.users.bulk_write([
+            UpdateOne({"userId": user_id}, {"$inc": {"vouchCount": delta}}, upsert=True)
+            for user_id, delta in deltas.items()
+        ], ordered=False)
+        
+        self.invalidate_stats()
+        if self.leaderboard:
+            cursor = self.db.users.find(
+                {"userId": {"$in": list(deltas)}},
+                {"_id": 0, "userId": 1, "vouchCount": 1, "displayName": 1}
+            )
+            async for user in cursor:
+                await self.leaderboard.set_score(user["userId"], user["vouchCount"], user.get("displayName"))
+    
+    async def reconcile_vouch_counts(self, batch_size: int = 1000) -> int:
+        """Rebuild every materialized vouch counter from the raw vouches
+        
+        Vouches written while the rebuild is running may be counted twice or
+        not at all, so run this during a quiet period.
+        """
+        reconciled_at = datetime.utcnow()
+        pipeline = [
+            {"$match": {"deleted": False}},
+            {"$group": {"_id": "$userId", "count": {"$sum": 1}}}
+        ]
+        
+        updated = 0
+        operations = []
+        async for row in self.db.vouches.aggregate(pipeline, allowDiskUse=True):
+            operations.append(UpdateOne(
+                {"userId": row["_id"]},
+                {"$set": {"vouchCount": row["count"], "vouchCountReconciledAt": reconciled_at}},
+                upsert=True
+            ))
+            if len(operations) >= batch_size:
+                await self.db.users.bulk_write(operations, ordered=False)
+                updated += len(operations)
+                operations = []
+        
+        if operations:
+            await self.db.users.bulk_write(operations, ordered=False)
+            updated += len(operations)
+        
+        # Users whose vouches were all deleted or transferred away
+        await self.db.users.update_many(
+            {"vouchCount": {"$exists": True}, "vouchCountReconciledAt": {"$ne": reconciled_at}},
+            {"$set": {"vouchCount": 0, "vouchCountReconciledAt": reconciled_at}}
+        )
+        
+        await self.warm_leaderboard()
+        return updated
+    
+    async def warm_leaderboard(self):
+        """Load the leaderboard from the materialized vouch counters"""
+        if not self.leaderboard:
+            return
+        
+        # Counters predate this deployment, build them once from the raw vouches
+        has_counters = await self.db.users.find_one({"vouchCount": {"$exists": True}}, {"_id": 1})
+        if not has_counters and await self.db.vouches.find_one({"deleted": False}, {"_id": 1}, hint=LIVE_VOUCH_INDEX):
+            await self.reconcile_vouch_counts()
+            return
+        
+        scores = []
+        cursor = self.db.users.find(
+            {"vouchCount": {"$gt": 0}},
+            {"userId": 1, "vouchCount": 1, "displayName": 1, "_id": 0}
+        )
+        async for user in cursor:
+            scores.append((user["userId"], user["vouchCount"], user.get("displayName")))
+        await self.leaderboard.load(scores)
     
     async def get_recent_vouch(self, user_id: int, vouched_by: int) -> Optional[Dict[str, Any]]:
         """Get most recent vouch from specific user"""
@@ -82,6 +271,15 @@ class VouchManager:
             "deleted": False
         }, sort=[("timestamp", -1)])
     
+    async def iter_vouches_since(self, since: datetime) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the live vouches created after a point in time"""
+        cursor = self.db.vouches.find(
+            {"timestamp": {"$gte": since}, "deleted": False},
+            {"_id": 0, "userId": 1, "vouchedBy": 1, "timestamp": 1}
+        )
+        async for vouch in cursor:
+            yield vouch
+    
     async def delete_vouches(self, user_id: int, count: int = None) -> int:
         """Delete vouches for a user"""
         query = {"userId": str(user_id), "deleted": False}
@@ -90,16 +288,18 @@ class VouchManager:
             vouches = await self.db.vouches.find(query).sort("timestamp", -1).limit(count).to_list(length=None)
             vouch_ids = [vouch["_id"] for vouch in vouches]
             result = await self.db.vouches.update_many(
-                {"_id": {"$in": vouch_ids}},
+                {"_id": {"$in": vouch_ids}, "deleted": False},
                 {"$set": {"deleted": True}}
             )
-            return result.modified_count
         else:
             result = await self.db.vouches.update_many(
                 query,
                 {"$set": {"deleted": True}}
             )
-            return result.modified_count
+        
+        if result.modified_count:
+            await self._adjust_vouch_count(user_id, -result.modified_count)
+        return result.modified_count
     
     async def transfer_vouches(self, from_user_id: int, to_user_id: int) -> int:
         """Transfer vouches from one user to another"""
@@ -107,75 +307,227 @@ class VouchManager:
             {"userId": str(from_user_id), "deleted": False},
             {"$set": {"userId": str(to_user_id)}}
         )
+        
+        if result.modified_count:
+            await self._adjust_vouch_count(from_user_id, -result.modified_count)
+            await self._adjust_vouch_count(to_user_id, result.modified_count)
         return result.modified_count
     
-    async def search_vouches(self, keyword: str, user_id: int = None) -> List[Dict[str, Any]]:
-        """Search vouches by keyword"""
+    async def search_vouches(self, keyword: str, user_id: int = None, offset: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """Search vouch messages by keyword, best matches first"""
         query = {
-            "message": {"$regex": keyword, "$options": "i"},
+            "$text": {"$search": keyword[:100]},
             "deleted": False
         }
         
         if user_id:
             query["userId"] = str(user_id)
-            
-        cursor = self.db.vouches.find(query).sort("timestamp", -1)
-        return await cursor.to_list(length=None)
+        
+        projection = {field: 1 for field in VOUCH_HISTORY_FIELDS}
+        projection["userId"] = 1
+        projection["score"] = {"$meta": "textScore"}
+        
+        cursor = self.db.vouches.find(query, projection).sort(
+            [("score", {"$meta": "textScore"}), ("timestamp", -1)]
+        ).skip(offset).limit(limit)
+        return await cursor.to_list(length=limit)
     
-    async def get_leaderboard(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get vouch leaderboard"""
-        pipeline = [
-            {"$match": {"deleted": False}},
-            {"$group": {"_id": "$userId", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": limit}
+    async def get_leaderboard(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """Get a page of the vouch leaderboard"""
+        if self.leaderboard:
+            return await self.leaderboard.page(offset, limit)
+        
+        cursor = self.db.users.find(
+            {"vouchCount": {"$gt": 0}},
+            {"_id": 0, "userId": 1, "vouchCount": 1, "displayName": 1}
+        ).sort("vouchCount", -1).skip(offset).limit(limit)
+        return [
+            {"_id": user["userId"], "count": user["vouchCount"], "name": user.get("displayName")}
+            async for user in cursor
         ]
-        return await self.db.vouches.aggregate(pipeline).to_list(length=None)
+    
+    async def get_leaderboard_size(self) -> int:
+        """Get the number of users on the vouch leaderboard"""
+        if self.leaderboard:
+            return await self.leaderboard.size()
+        return await self.db.users.count_documents({"vouchCount": {"$gt": 0}})
+    
+    async def get_leaderboard_rank(self, user_id: int) -> Optional[int]:
+        """Get the 1-based leaderboard rank of a user"""
+        if self.leaderboard:
+            return await self.leaderboard.rank(user_id)
+        
+        count = await self.get_vouch_count(user_id)
+        if not count:
+            return None
+        return await self.db.users.count_documents({"vouchCount": {"$gt": count}}) + 1
     
     async def get_stats(self) -> Dict[str, Any]:
-        """Get vouch statistics"""
-        total_vouches = await self.db.vouches.count_documents({"deleted": False})
+        """Get vouch statistics, served from the snapshot cache while it is fresh"""
+        if self._stats_snapshot is not None and time.monotonic() < self._stats_expires_at:
+            return self._stats_snapshot
         
-        pipeline_giver = [
-            {"$match": {"deleted": False}},
-            {"$group": {"_id": "$vouchedBy", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 1}
-        ]
-        top_giver = await self.db.vouches.aggregate(pipeline_giver).to_list(length=1)
+        async with self._stats_lock:
+            # Another caller may have refreshed the snapshot while we waited
+            if self._stats_snapshot is not None and time.monotonic() < self._stats_expires_at:
+                return self._stats_snapshot
+            
+            generation = self._stats_generation
+            snapshot = await self._compute_stats()
+            
+            # Only cache if no vouch was written while the pipeline ran
+            if generation == self._stats_generation:
+                self._stats_snapshot = snapshot
+                self._stats_expires_at = time.monotonic() + self.stats_ttl
         
-        pipeline_receiver = [
+        await self.db.stats.replace_one({"_id": "vouches"}, dict(snapshot), upsert=True)
+        return snapshot
+    
+    def invalidate_stats(self):
+        """Drop the cached stats snapshot after a vouch write"""
+        self._stats_snapshot = None
+        self._stats_expires_at = 0.0
+        self._stats_generation += 1
+    
+    async def _compute_stats(self) -> Dict[str, Any]:
+        """Compute totals, top givers, top receivers and daily volume in one pass"""
+        since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=self.stats_days - 1)
+        pipeline = [
             {"$match": {"deleted": False}},
-            {"$group": {"_id": "$userId", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 1}
+            {"$facet": {
+                "totals": [
+                    {"$group": {"_id": None, "total": {"$sum": 1}, "points": {"$sum": "$points"}}}
+                ],
+                "topGivers": [
+                    {"$group": {"_id": "$vouchedBy", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                    {"$limit": self.stats_top_n}
+                ],
+                "topReceivers": [
+                    {"$group": {"_id": "$userId", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                    {"$limit": self.stats_top_n}
+                ],
+                "daily": [
+                    {"$match": {"timestamp": {"$gte": since}}},
+                    {"$group": {
+                        "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                        "count": {"$sum": 1}
+                    }},
+                    {"$sort": {"_id": 1}}
+                ]
+            }}
         ]
-        top_receiver = await self.db.vouches.aggregate(pipeline_receiver).to_list(length=1)
+        result = await self.db.vouches.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+        facets = result[0] if result else {}
+        totals = facets.get("totals") or [{}]
+        top_givers = facets.get("topGivers", [])
+        top_receivers = facets.get("topReceivers", [])
         
         return {
-            "total": total_vouches,
-            "top_giver": top_giver[0] if top_giver else None,
-            "top_receiver": top_receiver[0] if top_receiver else None
+            "total": totals[0].get("total", 0),
+            "points": totals[0].get("points", 0),
+            "top_giver": top_givers[0] if top_givers else None,
+            "top_receiver": top_receivers[0] if top_receivers else None,
+            "top_givers": top_givers,
+            "top_receivers": top_receivers,
+            "daily": facets.get("daily", []),
+            "generated_at": datetime.utcnow()
         }
     
     async def bulk_create_vouches(self, user_id: int, vouched_by: int, count: int, message: str) -> int:
         """Create multiple vouches at once"""
-        vouches = []
-        for _ in range(count):
-            vouch_data = {
-                "userId": str(user_id),
-                "vouchedBy": str(vouched_by),
-                "points": 1,
-                "message": message,
-                "timestamp": datetime.utcnow(),
-                "deleted": False,
-                "vouchId": self.db.generate_id()
-            }
-            vouches.append(vouch_data)
-        
-        if vouches:
-            await self.db.vouches.insert_many(vouches)
-        return len(vouches)
+        timestamp = datetime.utcnow()
+        vouches = (
+            Vouch(self.db.generate_id(), user_id, vouched_by, message, timestamp=timestamp).to_dict()
+            for _ in range(count)
+        )
+        report = await self.ingest_vouches(vouches)
+        return report["inserted"]
+    
+    async def ingest_vouches(
+        self,
+        records: Union[Iterable[Dict[str, Any]], AsyncIterator[Dict[str, Any]]],
+        batch_size: int = 1000,
+        normalize: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Stream vouches into the collection in unordered batches
+        
+        ``records`` may be a plain or async iterable. Plain iterables are read
+        and normalized in a worker thread so file parsing never blocks the
+        event loop. ``normalize`` turns a raw record into a vouch document, or
+        None to skip it. Duplicate vouchIds are skipped, and counters, the
+        leaderboard and the stats snapshot are updated once per batch.
+        """
+        started = time.monotonic()
+        report = {"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "batches": 0}
+        
+        def take_batch(iterator: Iterator) -> Tuple[int, List[Dict[str, Any]]]:
+            raw = list(islice(iterator, batch_size))
+            documents = [normalize(record) for record in raw] if normalize else raw
+            return len(raw), [document for document in documents if document]
+        
+        if hasattr(records, "__aiter__"):
+            async def batches():
+                batch = []
+                async for record in records:
+                    report["read"] += 1
+                    document = normalize(record) if normalize else record
+                    if not document:
+                        report["invalid"] += 1
+                        continue
+                    batch.append(document)
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+        else:
+            iterator = iter(records)
+            
+            async def batches():
+                while True:
+                    read, batch = await asyncio.to_thread(take_batch, iterator)
+                    if not read:
+                        return
+                    report["read"] += read
+                    report["invalid"] += read - len(batch)
+                    if batch:
+                        yield batch
+        
+        async for batch in batches():
+            inserted, duplicates = await self._insert_vouch_batch(batch)
+            report["inserted"] += inserted
+            report["duplicates"] += duplicates
+            report["batches"] += 1
+        
+        report["seconds"] = time.monotonic() - started
+        report["per_second"] = report["inserted"] / report["seconds"] if report["seconds"] else 0.0
+        return report
+    
+    async def _insert_vouch_batch(self, batch: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Insert one batch unordered, returning (inserted, duplicates)"""
+        seen = set()
+        unique = []
+        for vouch in batch:
+            if vouch["vouchId"] not in seen:
+                seen.add(vouch["vouchId"])
+                unique.append(vouch)
+        
+        failed = set()
+        try:
+            await self.db.vouches.insert_many(unique, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                raise
+            failed = {error["index"] for error in errors}
+        
+        inserted = [vouch for index, vouch in enumerate(unique) if index not in failed]
+        await self._apply_vouch_count_deltas(Counter(
+            vouch["userId"] for vouch in inserted if not vouch.get("deleted")
+        ))
+        return len(inserted), len(batch) - len(inserted)
 
 class TicketManager:
     """Ticket system database operations"""
@@ -184,8 +536,9 @@ class TicketManager:
         self.db = db
     
     async def create_ticket(self, ticket_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a new ticket"""
-        ticket_data["ticketId"] = self.db.generate_id()
+        """Create a new ticket, keeping a caller-supplied ticketId"""
+        if not ticket_data.get("ticketId"):
+            ticket_data["ticketId"] = self.db.generate_id()
         ticket_data["createdAt"] = datetime.utcnow()
         ticket_data["status"] = "Pending"
         
@@ -208,16 +561,103 @@ class TicketManager:
         )
         return result.modified_count > 0
     
+    async def claim_close(self, ticket_id: str, stale_after: timedelta = timedelta(minutes=10)) -> Optional[str]:
+        """Atomically mark a ticket as Closing so only one close archives it
+        
+        Returns the status to restore with ``release_close`` if the archive
+        fails, or None if the ticket is missing, closed or already claimed. A
+        claim older than ``stale_after`` is treated as abandoned and can be
+        taken over.
+        """
+        now = datetime.utcnow()
+        ticket = await self.db.tickets.find_one_and_update(
+            {"ticketId": ticket_id, "$or": [
+                {"status": {"$nin": ["Closed", "Closing"]}},
+                {"status": "Closing", "closingAt": {"$lt": now - stale_after}}
+            ]},
+            {"$set": {"status": "Closing", "closingAt": now}},
+            projection={"status": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if ticket is None:
+            return None
+        return ticket["status"] if ticket["status"] != "Closing" else "Pending"
+    
+    async def release_close(self, ticket_id: str, status: str):
+        """Give up a close claim, restoring the ticket's previous status"""
+        await self.db.tickets.update_one(
+            {"ticketId": ticket_id, "status": "Closing"},
+            {"$set": {"status": status}, "$unset": {"closingAt": ""}}
+        )
+    
+    async def close_ticket(self, ticket_id: str, closed_by: int, transcript: Optional[str] = None) -> bool:
+        """Mark a ticket closed, keeping its record and transcript location
+        
+        Returns False if the ticket is missing or was already closed, so a
+        repeated close never overwrites the first close's transcript.
+        """
+        result = await self.db.tickets.update_one(
+            {"ticketId": ticket_id, "status": {"$ne": "Closed"}},
+            {"$set": {
+                "status": "Closed",
+                "closedAt": datetime.utcnow(),
+                "closedBy": str(closed_by),
+                "transcript": transcript
+            }, "$unset": {"closingAt": ""}}
+        )
+        return result.modified_count > 0
+    
     async def delete_ticket(self, ticket_id: str) -> bool:
         """Delete a ticket"""
         result = await self.db.tickets.delete_one({"ticketId": ticket_id})
         return result.deleted_count > 0
     
-    async def get_user_tickets(self, user_id: int, ticket_type: str = None) -> List[Dict[str, Any]]:
-        """Get all tickets for a user"""
+    async def iter_open_tickets(self) -> AsyncIterator[Ticket]:
+        """Stream every ticket that has not been closed"""
+        async for document in self.db.tickets.find({"status": {"$ne": "Closed"}}, Ticket.projection()):
+            yield Ticket.from_dict(document)
+    
+    async def list_tickets(
+        self,
+        status: str = "Pending",
+        ticket_type: str = None,
+        staff_name: str = None,
+        limit: int = 25,
+        cursor: Optional[Tuple[datetime, Any]] = None
+    ) -> Tuple[List[Ticket], Optional[Tuple[datetime, Any]]]:
+        """Get one page of tickets in a status, oldest first
+        
+        Filter by ``ticket_type`` or by assigned ``staff_name``. ``cursor`` is the
+        (createdAt, _id) of the last ticket on the previous page. Returns the page
+        and the cursor for the next one, or None on the last page.
+        """
+        if staff_name:
+            query = {"staffName": staff_name, "status": status}
+            if ticket_type:
+                query["type"] = ticket_type
+        else:
+            # An $in over every type lets the (status, type, createdAt) index merge-sort instead of sorting in memory
+            query = {"status": status, "type": ticket_type or {"$in": list(TICKET_PREFIXES)}}
+        
+        if cursor:
+            created_at, last_id = cursor
+            query["createdAt"] = {"$gte": created_at}
+            query["$or"] = [{"createdAt": {"$gt": created_at}}, {"_id": {"$gt": last_id}}]
+        
+        documents = await self.db.tickets.find(query, Ticket.projection()).sort(
+            [("createdAt", 1), ("_id", 1)]
+        ).limit(limit + 1).to_list(length=limit + 1)
+        tickets = [Ticket.from_dict(document) for document in documents[:limit]]
+        
+        if len(documents) <= limit:
+            return tickets, None
+        return tickets, (tickets[-1].created_at, tickets[-1].id)
+    
+    async def get_user_tickets(self, user_id: int, ticket_type: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get a user's most recent tickets"""
         query = {"userId": str(user_id)}
         if ticket_type:
             query["type"] = ticket_type
             
-        cursor = self.db.tickets.find(query).sort("createdAt", -1)
-        return await cursor.to_list(length=None)
\ No newline at end of file
+        cursor = self.db.tickets.find(query).sort("createdAt", -1).limit(limit)
+        return await cursor.to_list(length=limit)
\ No newline at end of file
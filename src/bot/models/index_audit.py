@@ -0,0 +1,154 @@
+"""Explain every VouchManager/TicketManager query and flag plans that skip the indexes
+
+Run from src/bot with ``python -m models.index_audit``. Exits non-zero if any
+query falls back to a COLLSCAN or an in-memory SORT stage.
+"""
+import asyncio
+import sys
+from datetime import datetime
+from typing import List, Dict, Any, Iterator
+
+from bson import ObjectId
+
+from models.database import MongoDB, LIVE_VOUCH_INDEX
+
+USER_ID = "0"
+OTHER_USER_ID = "1"
+
+# (query name, collection, filter, sort) for every find/update/delete filter the managers issue.
+# The stats, reconcile and import aggregations read whole collections by design and are not audited,
+# but the filters their follow-up writes and lookups use are.
+AUDITED_QUERIES = [
+    ("VouchManager.get_user_vouches", "vouches",
+     {"userId": USER_ID, "deleted": False}, [("timestamp", -1)]),
+    ("VouchManager.get_user_vouches(include_deleted)", "vouches",
+     {"userId": USER_ID, "deleted": {"$in": [False, True]}}, [("timestamp", -1)]),
+    ("VouchManager.get_user_vouches_page", "vouches",
+     {"userId": USER_ID, "deleted": False}, [("timestamp", -1), ("_id", -1)]),
+    ("VouchManager.get_user_vouches_page(cursor)", "vouches",
+     {"userId": USER_ID, "deleted": False, "timestamp": {"$lte": datetime(2024, 1, 1)},
+      "$or": [{"timestamp": {"$lt": datetime(2024, 1, 1)}}, {"_id": {"$lt": ObjectId()}}]},
+     [("timestamp", -1), ("_id", -1)]),
+    ("VouchManager.get_latest_vouch", "vouches",
+     {"userId": USER_ID, "deleted": False}, [("timestamp", -1)]),
+    ("VouchManager.get_recent_vouch", "vouches",
+     {"userId": USER_ID, "vouchedBy": OTHER_USER_ID, "deleted": False}, [("timestamp", -1)]),
+    ("VouchManager.iter_vouches_since", "vouches",
+     {"timestamp": {"$gte": datetime(2024, 1, 1)}, "deleted": False}, None),
+    ("VouchManager.delete_vouches", "vouches",
+     {"userId": USER_ID, "deleted": False}, [("timestamp", -1)]),
+    ("VouchManager.transfer_vouches", "vouches",
+     {"userId": USER_ID, "deleted": False}, None),
+    ("VouchManager.search_vouches", "vouches",
+     {"$text": {"$search": "audit"}, "deleted": False}, [("score", {"$meta": "textScore"}), ("timestamp", -1)]),
+    ("VouchManager.search_vouches(user)", "vouches",
+     {"$text": {"$search": "audit"}, "deleted": False, "userId": USER_ID},
+     [("score", {"$meta": "textScore"}), ("timestamp", -1)]),
+    ("VouchManager.delete_vouches(count)", "vouches",
+     {"_id": {"$in": [ObjectId()]}, "deleted": False}, None),
+    ("VouchManager.warm_leaderboard(live vouch probe)", "vouches",
+     {"deleted": False}, None),
+    ("VouchManager.warm_leaderboard(counter probe)", "users",
+     {"vouchCount": {"$exists": True}}, None),
+    ("VouchManager.get_vouch_count", "users",
+     {"userId": USER_ID}, None),
+    ("VouchManager._adjust_vouch_count", "users",
+     {"userId": USER_ID}, None),
+    ("VouchManager._apply_vouch_count_deltas", "users",
+     {"userId": {"$in": [USER_ID, OTHER_USER_ID]}}, None),
+    ("VouchManager.reconcile_vouch_counts(zero stale)", "users",
+     {"vouchCount": {"$exists": True}, "vouchCountReconciledAt": {"$ne": datetime(2024, 1, 1)}}, None),
+    ("VouchManager.get_leaderboard", "users",
+     {"vouchCount": {"$gt": 0}}, [("vouchCount", -1)]),
+    ("VouchManager.get_leaderboard_rank", "users",
+     {"vouchCount": {"$gt": 1}}, None),
+    ("StaffDirectory._write", "guilds",
+     {"guildId": USER_ID}, None),
+    ("StaffDirectory._fetch_since", "guilds",
+     {"staffPaymentsUpdatedAt": {"$gt": datetime(2024, 1, 1)}}, None),
+    ("TicketManager.get_ticket", "tickets",
+     {"ticketId": "audit"}, None),
+    ("TicketManager.claim_close", "tickets",
+     {"ticketId": "audit", "$or": [{"status": {"$nin": ["Closed", "Closing"]}},
+                                   {"status": "Closing", "closingAt": {"$lt": datetime(2024, 1, 1)}}]}, None),
+    ("TicketManager.close_ticket", "tickets",
+     {"ticketId": "audit", "status": {"$ne": "Closed"}}, None),
+    ("TicketManager.get_ticket_by_channel", "tickets",
+     {"channelId": 0}, None),
+    ("TicketManager.iter_open_tickets", "tickets",
+     {"status": {"$ne": "Closed"}}, None),
+    ("TicketManager.list_tickets", "tickets",
+     {"status": "Pending", "type": {"$in": ["shop", "mm"]}}, [("createdAt", 1), ("_id", 1)]),
+    ("TicketManager.list_tickets(type, cursor)", "tickets",
+     {"status": "Pending", "type": "shop", "createdAt": {"$gte": datetime(2024, 1, 1)},
+      "$or": [{"createdAt": {"$gt": datetime(2024, 1, 1)}}, {"_id": {"$gt": ObjectId()}}]},
+     [("createdAt", 1), ("_id", 1)]),
+    ("TicketManager.list_tickets(staff)", "tickets",
+     {"staffName": "audit", "status": "Pending"}, [("createdAt", 1), ("_id", 1)]),
+    ("TicketManager.get_user_tickets", "tickets",
+     {"userId": USER_ID}, [("createdAt", -1)]),
+    ("TicketManager.get_user_tickets(type)", "tickets",
+     {"userId": USER_ID, "type": "shop"}, [("createdAt", -1)]),
+]
+
+FORBIDDEN_STAGES = {"COLLSCAN", "SORT"}
+
+# Queries the managers pin to an index with hint()
+HINTS = {
+    "VouchManager.warm_leaderboard(live vouch probe)": LIVE_VOUCH_INDEX,
+}
+
+# Ranking by textScore sorts the matched set in memory; the match itself still comes from the text index
+ALLOWED_STAGES = {
+    "VouchManager.search_vouches": {"SORT"},
+    "VouchManager.search_vouches(user)": {"SORT"},
+}
+
+def iter_stages(plan: Dict[str, Any]) -> Iterator[str]:
+    """Yield every stage name in an explain plan tree"""
+    if "queryPlan" in plan:
+        plan = plan["queryPlan"]
+    
+    if "stage" in plan:
+        yield plan["stage"]
+    if "inputStage" in plan:
+        yield from iter_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        yield from iter_stages(child)
+
+async def audit_indexes(db: MongoDB) -> List[str]:
+    """Explain every audited query and return a description of each bad plan"""
+    problems = []
+    
+    for name, collection_name, query, sort in AUDITED_QUERIES:
+        cursor = getattr(db, collection_name).find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        if name in HINTS:
+            cursor = cursor.hint(HINTS[name])
+        
+        explain = await cursor.explain()
+        stages = list(iter_stages(explain["queryPlanner"]["winningPlan"]))
+        bad_stages = FORBIDDEN_STAGES.intersection(stages) - ALLOWED_STAGES.get(name, set())
+        
+        if bad_stages:
+            problems.append(f"{name}: {' <- '.join(stages)}")
+    
+    return problems
+
+async def main() -> int:
+    """Ensure indexes exist, audit every query and report the result"""
+    from utils.config import config
+    
+    db = MongoDB(config.MONGO_URI, config.MONGO_DB)
+    await db.initialize()
+    
+    problems = await audit_indexes(db)
+    for problem in problems:
+        print(f"FAIL {problem}")
+    
+    print(f"{len(AUDITED_QUERIES) - len(problems)}/{len(AUDITED_QUERIES)} queries use an index without an in-memory sort")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
\ No newline at end of file
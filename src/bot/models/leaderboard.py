@@ -0,0 +1,162 @@
+import logging
+from bisect import bisect_left, insort
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+from utils.config import config
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+class MemoryLeaderboard:
+    """In-process vouch leaderboard kept sorted by (-count, userId)
+    
+    Pages are list slices and ranks are a binary search, so reads cost
+    O(log n + page size). Score updates are a binary search plus a memmove.
+    Display names are kept alongside so a page renders without user lookups.
+    """
+    
+    def __init__(self):
+        self._scores: Dict[str, int] = {}
+        self._names: Dict[str, str] = {}
+        self._ranking: List[Tuple[int, str]] = []
+    
+    async def load(self, scores: Iterable[Tuple[str, int, Optional[str]]]):
+        """Replace the leaderboard with the given (userId, count, displayName) rows"""
+        self._scores = {}
+        self._names = {}
+        for user_id, count, name in scores:
+            if count > 0:
+                self._scores[str(user_id)] = count
+                if name:
+                    self._names[str(user_id)] = name
+        self._ranking = sorted((-count, user_id) for user_id, count in self._scores.items())
+    
+    async def set_score(self, user_id: int, count: int, name: str = None):
+        """Set the vouch count (and optionally display name) for a user, removing them at zero"""
+        user_id = str(user_id)
+        old_count = self._scores.pop(user_id, None)
+        
+        if old_count is not None:
+            index = bisect_left(self._ranking, (-old_count, user_id))
+            del self._ranking[index]
+        
+        if count > 0:
+            self._scores[user_id] = count
+            insort(self._ranking, (-count, user_id))
+            if name:
+                self._names[user_id] = name
+        else:
+            self._names.pop(user_id, None)
+    
+    async def page(self, offset: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get a page of the leaderboard"""
+        return [
+            {"_id": user_id, "count": -negative_count, "name": self._names.get(user_id)}
+            for negative_count, user_id in self._ranking[offset:offset + limit]
+        ]
+    
+    async def rank(self, user_id: int) -> Optional[int]:
+        """Get the 1-based rank of a user, or None if they are not ranked"""
+        user_id = str(user_id)
+        count = self._scores.get(user_id)
+        if count is None:
+            return None
+        return bisect_left(self._ranking, (-count, user_id)) + 1
+    
+    async def size(self) -> int:
+        """Get the number of ranked users"""
+        return len(self._ranking)
+
+class RedisLeaderboard:
+    """Vouch leaderboard stored in a Redis sorted set
+    
+    Shared by every bot process pointing at the same Redis instance.
+    """
+    
+    def __init__(self, redis, key: str = "vouch:leaderboard"):
+        self.redis = redis
+        self.key = key
+        self.names_key = f"{key}:names"
+    
+    async def load(self, scores: Iterable[Tuple[str, int, Optional[str]]], batch_size: int = 1000):
+        """Replace the leaderboard with the given (userId, count, displayName) rows"""
+        staging_key = f"{self.key}:loading"
+        staging_names_key = f"{self.names_key}:loading"
+        await self.redis.delete(staging_key, staging_names_key)
+        
+        loaded = 0
+        batch = {}
+        names = {}
+        for user_id, count, name in scores:
+            if count > 0:
+                batch[str(user_id)] = count
+                if name:
+                    names[str(user_id)] = name
+            if len(batch) >= batch_size:
+                await self._load_batch(staging_key, staging_names_key, batch, names)
+                loaded += len(batch)
+                batch = {}
+                names = {}
+        
+        if batch:
+            await self._load_batch(staging_key, staging_names_key, batch, names)
+            loaded += len(batch)
+        
+        if not loaded:
+            await self.redis.delete(self.key, self.names_key)
+            return
+        
+        # Swap scores and names together so readers never see one without the other
+        has_names = await self.redis.exists(staging_names_key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rename(staging_key, self.key)
+            if has_names:
+                pipe.rename(staging_names_key, self.names_key)
+            else:
+                pipe.delete(self.names_key)
+            await pipe.execute()
+    
+    async def _load_batch(self, scores_key: str, names_key: str, batch: Dict[str, int], names: Dict[str, str]):
+        await self.redis.zadd(scores_key, batch)
+        if names:
+            await self.redis.hset(names_key, mapping=names)
+    
+    async def set_score(self, user_id: int, count: int, name: str = None):
+        """Set the vouch count (and optionally display name) for a user, removing them at zero"""
+        if count > 0:
+            await self.redis.zadd(self.key, {str(user_id): count})
+            if name:
+                await self.redis.hset(self.names_key, str(user_id), name)
+        else:
+            await self.redis.zrem(self.key, str(user_id))
+            await self.redis.hdel(self.names_key, str(user_id))
+    
+    async def page(self, offset: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get a page of the leaderboard"""
+        rows = await self.redis.zrevrange(self.key, offset, offset + limit - 1, withscores=True)
+        if not rows:
+            return []
+        
+        names = await self.redis.hmget(self.names_key, [user_id for user_id, _ in rows])
+        return [
+            {"_id": user_id, "count": int(count), "name": name}
+            for (user_id, count), name in zip(rows, names)
+        ]
+    
+    async def rank(self, user_id: int) -> Optional[int]:
+        """Get the 1-based rank of a user, or None if they are not ranked"""
+        rank = await self.redis.zrevrank(self.key, str(user_id))
+        return rank + 1 if rank is not None else None
+    
+    async def size(self) -> int:
+        """Get the number of ranked users"""
+        return await self.redis.zcard(self.key)
+
+def create_leaderboard():
+    """Create the leaderboard backend selected by LEADERBOARD_BACKEND"""
+    if config.LEADERBOARD_BACKEND == 'redis':
+        redis = get_redis()
+        if redis is not None:
+            return RedisLeaderboard(redis)
+        logger.warning("Falling back to in-process vouch leaderboard")
+    return MemoryLeaderboard()
\ No newline at end of file
@@ -1,9 +1,38 @@
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional
 
-class Ticket:
+from models.codec import Document, SNOWFLAKE
+
+class Ticket(Document):
     """Ticket data model"""
     
+    __slots__ = (
+        "id", "ticket_id", "user_id", "channel_id", "type", "status", "category", "order",
+        "quantity", "notes", "staff_name", "amount", "transact_partner", "close_message_id",
+        "created_at", "closed_at", "closed_by", "transcript"
+    )
+    
+    FIELDS = (
+        ("id", "_id", None, None),
+        ("ticket_id", "ticketId", None, None),
+        ("user_id", "userId", SNOWFLAKE, None),
+        ("channel_id", "channelId", None, None),
+        ("type", "type", None, None),
+        ("status", "status", None, "Pending"),
+        ("category", "category", None, None),
+        ("order", "order", None, None),
+        ("quantity", "quantity", None, 1),
+        ("notes", "notes", None, None),
+        ("staff_name", "staffName", None, None),
+        ("amount", "amount", None, None),
+        ("transact_partner", "transactPartner", SNOWFLAKE, None),
+        ("close_message_id", "closeMessageId", None, None),
+        ("created_at", "createdAt", None, None),
+        ("closed_at", "closedAt", None, None),
+        ("closed_by", "closedBy", SNOWFLAKE, None),
+        ("transcript", "transcript", None, None),
+    )
+    
     def __init__(
         self,
         ticket_id: str,
@@ -18,8 +47,10 @@ class Ticket:
         staff_name: str = None,
         amount: float = None,
         transact_partner: int = None,
-        close_message_id: int = None
+        close_message_id: int = None,
+        created_at: Optional[datetime] = None
     ):
+        self.id = None
         self.ticket_id = ticket_id
         self.user_id = user_id
         self.channel_id = channel_id
@@ -33,42 +64,7 @@ class Ticket:
         self.amount = amount
         self.transact_partner = transact_partner
         self.close_message_id = close_message_id
-        self.created_at = datetime.utcnow()
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for database storage"""
-        return {
-            "ticketId": self.ticket_id,
-            "userId": str(self.user_id),
-            "channelId": self.channel_id,
-            "type": self.type,
-            "status": self.status,
-            "category": self.category,
-            "order": self.order,
-            "quantity": self.quantity,
-            "notes": self.notes,
-            "staffName": self.staff_name,
-            "amount": self.amount,
-            "transactPartner": str(self.transact_partner) if self.transact_partner else None,
-            "closeMessageId": self.close_message_id,
-            "createdAt": self.created_at
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'Ticket':
-        """Create Ticket instance from dictionary"""
-        return cls(
-            ticket_id=data.get('ticketId'),
-            user_id=int(data.get('userId')),
-            channel_id=data.get('channelId'),
-            ticket_type=data.get('type'),
-            status=data.get('status', 'Pending'),
-            category=data.get('category'),
-            order=data.get('order'),
-            quantity=data.get('quantity', 1),
-            notes=data.get('notes'),
-            staff_name=data.get('staffName'),
-            amount=data.get('amount'),
-            transact_partner=int(data.get('transactPartner')) if data.get('transactPartner') else None,
-            close_message_id=data.get('closeMessageId')
-        )
\ No newline at end of file
+        self.created_at = created_at or datetime.utcnow()
+        self.closed_at = None
+        self.closed_by = None
+        self.transcript = None
\ No newline at end of file
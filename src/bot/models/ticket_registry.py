@@ -0,0 +1,195 @@
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+
+from models.database import TicketManager
+from models.ticket_models import Ticket
+
+logger = logging.getLogger(__name__)
+
+class TicketRegistry:
+    """In-process index of open tickets by ticketId and channelId
+    
+    Reads are served from memory and fall back to TicketManager on a miss.
+    Writes go to TicketManager first and are applied to the cached ticket once
+    they succeed, so the registry never holds state Mongo does not. Tickets
+    are held as slotted Ticket models rather than raw documents.
+    
+    ``on_change`` is awaited with the ticket ID after every write so other
+    processes can ``refresh`` their copy.
+    """
+    
+    def __init__(self, ticket_manager: TicketManager):
+        self.ticket_manager = ticket_manager
+        self.by_id: Dict[str, Ticket] = {}
+        self.by_channel: Dict[int, Ticket] = {}
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+        self._queue_cache: Optional[Tuple[int, Dict[str, List[datetime]], Counter]] = None
+        self.on_change: Optional[Callable[[str], Awaitable[None]]] = None
+    
+    def __len__(self) -> int:
+        return len(self.by_id)
+    
+    async def warm(self):
+        """Load every open ticket from the database"""
+        self.by_id.clear()
+        self.by_channel.clear()
+        self.version += 1
+        async for ticket in self.ticket_manager.iter_open_tickets():
+            self._put(ticket)
+        logger.info(f"Loaded {len(self)} open tickets into the registry")
+    
+    def _put(self, ticket: Ticket):
+        self.version += 1
+        self.by_id[ticket.ticket_id] = ticket
+        if ticket.channel_id is not None:
+            self.by_channel[ticket.channel_id] = ticket
+    
+    def _evict(self, ticket: Ticket):
+        self.version += 1
+        self.by_id.pop(ticket.ticket_id, None)
+        if self.by_channel.get(ticket.channel_id) is ticket:
+            del self.by_channel[ticket.channel_id]
+    
+    async def _changed(self, ticket_id: str):
+        if self.on_change is not None:
+            await self.on_change(ticket_id)
+    
+    async def refresh(self, ticket_id: str):
+        """Reload a ticket another process changed, dropping it once closed or deleted"""
+        ticket = self.by_id.get(ticket_id)
+        if ticket is not None:
+            self._evict(ticket)
+        
+        document = await self.ticket_manager.get_ticket(ticket_id)
+        if document is not None and document.get("status") != "Closed":
+            self._put(Ticket.from_dict(document))
+    
+    async def get(self, ticket_id: str) -> Optional[Ticket]:
+        """Get ticket by ID"""
+        ticket = self.by_id.get(ticket_id)
+        if ticket is not None:
+            self.hits += 1
+            return ticket
+        
+        self.misses += 1
+        document = await self.ticket_manager.get_ticket(ticket_id)
+        if document is None:
+            return None
+        ticket = Ticket.from_dict(document)
+        # Only open tickets are tracked; closed ones would skew stale() and queue_stats()
+        if ticket.status != "Closed":
+            self._put(ticket)
+        return ticket
+    
+    async def get_by_channel(self, channel_id: int) -> Optional[Ticket]:
+        """Get ticket by channel ID"""
+        ticket = self.by_channel.get(channel_id)
+        if ticket is not None:
+            self.hits += 1
+            return ticket
+        
+        self.misses += 1
+        document = await self.ticket_manager.get_ticket_by_channel(channel_id)
+        if document is None:
+            return None
+        ticket = Ticket.from_dict(document)
+        # Only open tickets are tracked; closed ones would skew stale() and queue_stats()
+        if ticket.status != "Closed":
+            self._put(ticket)
+        return ticket
+    
+    async def create(self, ticket: Ticket) -> Ticket:
+        """Create a ticket and register it"""
+        ticket = Ticket.from_dict(await self.ticket_manager.create_ticket(ticket.to_dict()))
+        self._put(ticket)
+        await self._changed(ticket.ticket_id)
+        return ticket
+    
+    async def update(self, ticket_id: str, update_data: Dict[str, Any]) -> bool:
+        """Update a ticket in the database, then in memory"""
+        updated = await self.ticket_manager.update_ticket(ticket_id, update_data)
+        
+        ticket = self.by_id.get(ticket_id)
+        if ticket is not None:
+            self._evict(ticket)
+            ticket.apply(update_data)
+            self._put(ticket)
+        if updated:
+            await self._changed(ticket_id)
+        return updated
+    
+    async def delete(self, ticket_id: str) -> bool:
+        """Delete a ticket from the database and the registry"""
+        deleted = await self.ticket_manager.delete_ticket(ticket_id)
+        
+        ticket = self.by_id.get(ticket_id)
+        if ticket is not None:
+            self._evict(ticket)
+        if deleted:
+            await self._changed(ticket_id)
+        return deleted
+    
+    async def close(self, ticket_id: str, closed_by: int, transcript: Optional[str] = None) -> bool:
+        """Mark a ticket closed in the database and stop tracking it"""
+        closed = await self.ticket_manager.close_ticket(ticket_id, closed_by, transcript)
+        
+        ticket = self.by_id.get(ticket_id)
+        if ticket is not None:
+            self._evict(ticket)
+        if closed:
+            await self._changed(ticket_id)
+        return closed
+    
+    def stale(self, cutoff: datetime) -> List[Ticket]:
+        """Open tickets created before the cutoff, oldest first"""
+        tickets = [t for t in self.by_id.values() if t.created_at and t.created_at < cutoff]
+        return sorted(tickets, key=lambda t: t.created_at)
+    
+    def evict_channel(self, channel_id: int):
+        """Forget the ticket bound to a deleted channel"""
+        ticket = self.by_channel.get(channel_id)
+        if ticket is not None:
+            self._evict(ticket)
+    
+    def queue_stats(self) -> Dict[str, Any]:
+        """Open ticket depth and age percentiles per type, plus tickets per staff member
+        
+        Built from the registry rather than the collection; the grouped creation
+        times are only regrouped after a ticket is added, updated or removed.
+        """
+        if self._queue_cache is None or self._queue_cache[0] != self.version:
+            created: Dict[str, List[datetime]] = {}
+            staff = Counter()
+            for ticket in self.by_id.values():
+                if ticket.created_at:
+                    created.setdefault(ticket.type or "unknown", []).append(ticket.created_at)
+                if ticket.staff_name:
+                    staff[ticket.staff_name] += 1
+            for times in created.values():
+                times.sort()
+            self._queue_cache = (self.version, created, staff)
+        
+        _, created, staff = self._queue_cache
+        now = datetime.utcnow()
+        
+        def age(times: List[datetime], q: float) -> float:
+            # Oldest first, so the q-th age percentile counts back from the newest ticket
+            return (now - times[len(times) - 1 - int(q * (len(times) - 1))]).total_seconds()
+        
+        return {
+            "types": {
+                ticket_type: {
+                    "depth": len(times),
+                    "p50_age": age(times, 0.5),
+                    "p90_age": age(times, 0.9),
+                    "oldest_age": age(times, 1.0),
+                }
+                for ticket_type, times in created.items()
+            },
+            "staff": dict(staff.most_common()),
+            "generated_at": now,
+        }
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""Readers for importing vouch histories exported by other bots
+
+Run from src/bot with ``python -m models.vouch_import <file> [batch_size]``
+to import a CSV, JSON Lines or JSON export straight into the database. A
+running bot with the in-process leaderboard picks the new counters up on
+its next restart or /vouchreconcile.
+"""
+import asyncio
+import csv
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterator, Optional
+
+# Namespace for vouch IDs derived from record contents, so re-importing an export dedupes
+IMPORT_NAMESPACE = uuid.UUID("0b8f4d0e-6a52-4c4f-9f5e-2d1c7a3e9b61")
+
+FIELD_ALIASES = {
+    "userId": ("userId", "user_id", "receiver", "receiverId", "vouchedUser"),
+    "vouchedBy": ("vouchedBy", "vouched_by", "giver", "giverId", "author", "authorId"),
+    "message": ("message", "comment", "content", "reason"),
+    "timestamp": ("timestamp", "createdAt", "created_at", "date"),
+    "points": ("points",),
+    "deleted": ("deleted",),
+    "vouchId": ("vouchId", "vouch_id", "id"),
+}
+
+def _field(record: Dict[str, Any], name: str) -> Any:
+    for alias in FIELD_ALIASES[name]:
+        value = record.get(alias)
+        if value not in (None, ""):
+            return value
+    return None
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a datetime, ISO 8601 string or Unix timestamp (s or ms) into naive UTC"""
+    if value is None:
+        return None
+    
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, (int, float)) or (isinstance(value, str) and value.replace('.', '', 1).isdigit()):
+        seconds = float(value)
+        if seconds > 1e11:
+            seconds /= 1000
+        parsed = datetime.fromtimestamp(seconds, tz=timezone.utc)
+    else:
+        parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def normalize_vouch(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Turn an exported record into a vouch document, or None if it is unusable"""
+    user_id = str(_field(record, "userId") or "").strip()
+    vouched_by = str(_field(record, "vouchedBy") or "").strip()
+    if not user_id.isdigit() or not vouched_by.isdigit():
+        return None
+    
+    try:
+        timestamp = _parse_timestamp(_field(record, "timestamp"))
+        points = int(_field(record, "points") or 1)
+    except (TypeError, ValueError):
+        return None
+    
+    message = str(_field(record, "message") or "No comment")[:500]
+    deleted = _field(record, "deleted")
+    if isinstance(deleted, str):
+        deleted = deleted.strip().lower() in ("1", "true", "yes")
+    
+    vouch_id = _field(record, "vouchId")
+    if not vouch_id:
+        # Only fields present in the export, so the same record always maps to the same ID
+        stamp = timestamp.isoformat() if timestamp else ""
+        vouch_id = uuid.uuid5(IMPORT_NAMESPACE, f"{user_id}|{vouched_by}|{stamp}|{message}")
+    
+    if timestamp is None:
+        timestamp = datetime.utcnow()
+    
+    return {
+        "userId": user_id,
+        "vouchedBy": vouched_by,
+        "points": points,
+        "message": message,
+        "timestamp": timestamp,
+        "deleted": bool(deleted),
+        "vouchId": str(vouch_id)
+    }
+
+def read_vouch_file(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream raw records from a .csv, .jsonl/.ndjson or .json export
+    
+    CSV and JSON Lines are read a row at a time. A .json file holding one
+    array has to be parsed whole, so prefer JSON Lines for large exports.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    
+    with open(path, newline='', encoding='utf-8') as file:
+        if extension == '.csv':
+            yield from csv.DictReader(file)
+        elif extension in ('.jsonl', '.ndjson'):
+            for line in file:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        elif extension == '.json':
+            data = json.load(file)
+            yield from data.get("vouches", []) if isinstance(data, dict) else data
+        else:
+            raise ValueError(f"Unsupported vouch export format: {extension}")
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Summarize an ingest report on one line"""
+    return (
+        f"read {report['read']}, inserted {report['inserted']}, "
+        f"duplicates {report['duplicates']}, invalid {report['invalid']} "
+        f"in {report['seconds']:.1f}s ({report['per_second']:.0f} vouches/s)"
+    )
+
+async def main(path: str, batch_size: int) -> int:
+    """Import a vouch export into the configured database"""
+    from utils.config import config
+    from models.database import MongoDB, VouchManager
+    
+    db = MongoDB(config.MONGO_URI, config.MONGO_DB)
+    await db.initialize()
+    
+    report = await VouchManager(db).ingest_vouches(read_vouch_file(path), batch_size, normalize_vouch)
+    print(format_report(report))
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m models.vouch_import <file> [batch_size]")
+        sys.exit(2)
+    sys.exit(asyncio.run(main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 1000)))
\ No newline at end of file
@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Optional
+
+from models.codec import Document, SNOWFLAKE
+
+class Vouch(Document):
+    """Vouch data model"""
+    
+    __slots__ = ("id", "vouch_id", "user_id", "vouched_by", "points", "message", "timestamp", "deleted")
+    
+    FIELDS = (
+        ("id", "_id", None, None),
+        ("vouch_id", "vouchId", None, None),
+        ("user_id", "userId", SNOWFLAKE, None),
+        ("vouched_by", "vouchedBy", SNOWFLAKE, None),
+        ("points", "points", None, 1),
+        ("message", "message", None, None),
+        ("timestamp", "timestamp", None, None),
+        ("deleted", "deleted", None, False),
+    )
+    
+    def __init__(
+        self,
+        vouch_id: str,
+        user_id: int,
+        vouched_by: int,
+        message: str,
+        points: int = 1,
+        timestamp: Optional[datetime] = None,
+        deleted: bool = False
+    ):
+        self.id = None
+        self.vouch_id = vouch_id
+        self.user_id = user_id
+        self.vouched_by = vouched_by
+        self.message = message
+        self.points = points
+        self.timestamp = timestamp or datetime.utcnow()
+        self.deleted = deleted
\ No newline at end of file
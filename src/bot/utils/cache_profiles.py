@@ -0,0 +1,175 @@
+import logging
+import sys
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Gateway intents each extension needs beyond the guilds/DM baseline
+EXTENSION_INTENTS = {
+    "extensions.tickets": ("members", "message_content"),  # member index, transcripts
+    "extensions.utilities": ("members",),  # server owner and member info
+    "extensions.music": ("voice_states",),
+}
+
+ALL_EXTENSIONS = (
+    "extensions.admin",
+    "extensions.moderation",
+    "extensions.security",
+    "extensions.music",
+    "extensions.economy",
+    "extensions.utilities",
+    "extensions.tickets",
+    "extensions.vouch",
+)
+
+# Rough per-object footprint used for the estimate column of the startup report
+ESTIMATED_BYTES = {
+    "guilds": 4096,
+    "channels": 700,
+    "roles": 450,
+    "members": 550,
+    "users": 400,
+    "messages": 2500,
+    "emojis": 350,
+}
+
+class CacheProfile:
+    """Extensions to load plus the intents and caches they need"""
+    
+    def __init__(
+        self,
+        name: str,
+        extensions: Tuple[str, ...],
+        max_messages: Optional[int],
+        chunk_guilds_at_startup: bool,
+        all_intents: bool = False
+    ):
+        self.name = name
+        self.extensions = extensions
+        self.max_messages = max_messages
+        self.chunk_guilds_at_startup = chunk_guilds_at_startup
+        self.all_intents = all_intents
+    
+    def intents(self) -> discord.Intents:
+        """Smallest intent set covering every extension in the profile"""
+        if self.all_intents:
+            intents = discord.Intents.all()
+            intents.typing = False
+            return intents
+        
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.dm_messages = True
+        for extension in self.extensions:
+            for intent in EXTENSION_INTENTS.get(extension, ()):
+                setattr(intents, intent, True)
+        return intents
+    
+    def member_cache_flags(self, intents: discord.Intents) -> discord.MemberCacheFlags:
+        """Cache members only as far as the enabled intents keep them current"""
+        if not intents.members:
+            return discord.MemberCacheFlags.none()
+        return discord.MemberCacheFlags.from_intents(intents)
+    
+    def client_options(self) -> Dict[str, Any]:
+        """Keyword arguments for the Bot constructor"""
+        intents = self.intents()
+        return {
+            "intents": intents,
+            "member_cache_flags": self.member_cache_flags(intents),
+            "max_messages": self.max_messages,
+            "chunk_guilds_at_startup": self.chunk_guilds_at_startup and intents.members,
+        }
+
+PROFILES = {
+    "minimal": CacheProfile(
+        "minimal",
+        ("extensions.vouch",),
+        max_messages=None,
+        chunk_guilds_at_startup=False
+    ),
+    "tickets_vouch": CacheProfile(
+        "tickets_vouch",
+        ("extensions.moderation", "extensions.utilities", "extensions.tickets", "extensions.vouch"),
+        max_messages=None,
+        chunk_guilds_at_startup=True
+    ),
+    "full": CacheProfile(
+        "full",
+        ALL_EXTENSIONS,
+        max_messages=10000,
+        chunk_guilds_at_startup=True,
+        all_intents=True
+    ),
+}
+
+def get_profile(name: str) -> CacheProfile:
+    """Look up a cache profile by name"""
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown cache profile {name!r}, expected one of {', '.join(PROFILES)}") from None
+
+def _shallow_size(obj: Any) -> int:
+    """Size of an object plus the attribute values it holds directly"""
+    size = sys.getsizeof(obj)
+    slots = [slot for cls in type(obj).__mro__ for slot in getattr(cls, "__slots__", ())]
+    values = [getattr(obj, slot, None) for slot in slots]
+    if hasattr(obj, "__dict__"):
+        values.extend(vars(obj).values())
+    for value in values:
+        # Shared objects (the state, the guild) are counted once under their own category
+        if isinstance(value, (str, bytes, int, float, tuple, list, dict)):
+            size += sys.getsizeof(value)
+    return size
+
+def _measure(objects: Iterable[Any], count: int, sample: int = 100) -> int:
+    sampled = list(islice(objects, sample))
+    if not sampled:
+        return 0
+    return int(sum(_shallow_size(obj) for obj in sampled) / len(sampled) * count)
+
+def cache_report(bot: discord.Client) -> List[Tuple[str, int, int, int]]:
+    """(category, objects, estimated bytes, sampled bytes) for each client cache"""
+    guilds = bot.guilds
+    categories = {
+        "guilds": (guilds, len(guilds)),
+        "channels": ((c for g in guilds for c in g.channels), sum(len(g.channels) for g in guilds)),
+        "roles": ((r for g in guilds for r in g.roles), sum(len(g.roles) for g in guilds)),
+        "members": ((m for g in guilds for m in g.members), sum(len(g.members) for g in guilds)),
+        "users": (bot.users, len(bot.users)),
+        "messages": (bot.cached_messages, len(bot.cached_messages)),
+        "emojis": (bot.emojis, len(bot.emojis)),
+    }
+    return [
+        (name, count, count * ESTIMATED_BYTES[name], _measure(objects, count))
+        for name, (objects, count) in categories.items()
+    ]
+
+def _rss_megabytes() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def log_cache_report(bot: discord.Client, profile: CacheProfile):
+    """Log estimated and sampled cache memory per category"""
+    rows = cache_report(bot)
+    lines = [f"Cache report for profile '{profile.name}':", f"{'category':<10} {'objects':>9} {'estimated':>11} {'sampled':>11}"]
+    for name, count, estimated, sampled in rows:
+        lines.append(f"{name:<10} {count:>9} {estimated / 1024:>9.0f}KB {sampled / 1024:>9.0f}KB")
+    
+    total_estimated = sum(row[2] for row in rows)
+    total_sampled = sum(row[3] for row in rows)
+    lines.append(f"{'total':<10} {'':>9} {total_estimated / 1024:>9.0f}KB {total_sampled / 1024:>9.0f}KB")
+    
+    rss = _rss_megabytes()
+    if rss is not None:
+        lines.append(f"Peak process RSS: {rss:.0f}MB")
+    logger.info("\n".join(lines))
\ No newline at end of file
@@ -0,0 +1,149 @@
+import asyncio
+import contextlib
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .redis_client import get_redis
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:
+    RedisError = OSError
+
+logger = logging.getLogger(__name__)
+
+REQUEST_CHANNEL = "cluster:ipc"
+REPLY_CHANNEL = "cluster:ipc:reply:{nonce}"
+
+# Reconnect delays for the request listener after Redis drops
+MIN_RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 30
+
+def owns_guild(guild_id: int, shard_ids: List[int], shard_count: int) -> bool:
+    """Whether a guild is served by one of this process's shards (all of them when unsharded)"""
+    if not shard_ids or not shard_count:
+        return True
+    return (guild_id >> 22) % shard_count in shard_ids
+
+Handler = Callable[..., Awaitable[Optional[Dict[str, Any]]]]
+
+class ClusterIPC:
+    """Request/reply queries between bot processes over Redis pub/sub
+    
+    Every process subscribes to one request channel and answers the ops it
+    has registered. ``query`` publishes a request and collects one reply per
+    subscribed process until all have answered or the timeout passes.
+    ``publish`` notifies the other processes without waiting for replies.
+    With a single cluster, or without Redis, queries are answered locally
+    and notifications are dropped.
+    """
+    
+    def __init__(self, cluster_id: int, cluster_count: int):
+        self.cluster_id = cluster_id
+        self.cluster_count = cluster_count
+        self.handlers: Dict[str, Handler] = {}
+        self.redis = get_redis() if cluster_count > 1 else None
+        self._task = None
+        self._reconnect_delay = MIN_RECONNECT_DELAY
+    
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None
+    
+    def register(self, op: str, handler: Handler):
+        """Answer ``op`` queries and notifications; the handler gets the request's data as kwargs"""
+        self.handlers[op] = handler
+    
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._serve())
+    
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    async def _serve(self):
+        """Keep the request listener subscribed, reconnecting with a backoff"""
+        while True:
+            try:
+                await self._listen()
+            except (RedisError, OSError) as e:
+                logger.warning(f"IPC listener lost Redis ({e}), reconnecting in {self._reconnect_delay}s")
+            await asyncio.sleep(self._reconnect_delay)
+            self._reconnect_delay = min(self._reconnect_delay * 2, MAX_RECONNECT_DELAY)
+    
+    async def _listen(self):
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(REQUEST_CHANNEL)
+        self._reconnect_delay = MIN_RECONNECT_DELAY
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    request = json.loads(message["data"])
+                    handler = self.handlers.get(request["op"])
+                    nonce = request.get("nonce")
+                    if handler is None or (nonce is None and request.get("origin") == self.cluster_id):
+                        continue
+                    result = await handler(**request.get("data", {}))
+                    if nonce is not None:
+                        reply = {"cluster": self.cluster_id, "data": result}
+                        await self.redis.publish(REPLY_CHANNEL.format(nonce=nonce), json.dumps(reply))
+                except Exception as e:
+                    logger.error(f"IPC request failed: {e}")
+        finally:
+            with contextlib.suppress(RedisError, OSError):
+                await pubsub.unsubscribe(REQUEST_CHANNEL)
+                await pubsub.close()
+    
+    async def publish(self, op: str, **data):
+        """Tell every other process about ``op`` without waiting for replies"""
+        if not self.enabled:
+            return
+        try:
+            await self.redis.publish(REQUEST_CHANNEL, json.dumps({"op": op, "origin": self.cluster_id, "data": data}))
+        except Exception as e:
+            logger.error(f"IPC publish {op} failed: {e}")
+    
+    async def query(self, op: str, timeout: float = 1.0) -> List[Dict[str, Any]]:
+        """Ask every process for ``op`` and return the replies that arrived in time
+        
+        Falls back to this process's own answer when Redis is unavailable.
+        """
+        if self.enabled:
+            try:
+                return await self._query(op, timeout)
+            except (RedisError, OSError) as e:
+                logger.warning(f"IPC {op} query failed ({e}), answering locally")
+        return [await self.handlers[op]()]
+    
+    async def _query(self, op: str, timeout: float) -> List[Dict[str, Any]]:
+        nonce = uuid.uuid4().hex
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(REPLY_CHANNEL.format(nonce=nonce))
+        
+        replies: List[Dict[str, Any]] = []
+        try:
+            expected = await self.redis.publish(REQUEST_CHANNEL, json.dumps({"op": op, "nonce": nonce}))
+            
+            async def collect():
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        replies.append(json.loads(message["data"])["data"])
+                        if len(replies) >= expected:
+                            return
+            
+            try:
+                await asyncio.wait_for(collect(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"IPC {op}: {len(replies)}/{expected} clusters replied within {timeout}s")
+        finally:
+            with contextlib.suppress(RedisError, OSError):
+                await pubsub.unsubscribe()
+                await pubsub.close()
+        
+        return replies
\ No newline at end of file
@@ -13,6 +13,8 @@ class Config:
     DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
     BOT_PREFIX = os.getenv('BOT_PREFIX', '!')
     BOT_STATUS = os.getenv('BOT_STATUS', 'online')
+    CACHE_PROFILE = os.getenv('CACHE_PROFILE', 'full')  # 'minimal', 'tickets_vouch' or 'full'
+    EXTENSION_LOAD_TIMEOUT = float(os.getenv('EXTENSION_LOAD_TIMEOUT', '60'))
     BOT_ACTIVITY = os.getenv('BOT_ACTIVITY', 'Monitoring your server')
     
     # Database
@@ -21,6 +23,8 @@ class Config:
     REDIS_HOST = os.getenv('REDIS_HOST', 'redis')
     REDIS_PORT = int(os.getenv('REDIS_PORT', '6379'))
     REDIS_PASSWORD = os.getenv('REDIS_PASSWORD')
+    LEADERBOARD_BACKEND = os.getenv('LEADERBOARD_BACKEND', 'memory')  # 'memory' or 'redis'
+    COOLDOWN_BACKEND = os.getenv('COOLDOWN_BACKEND', 'memory')  # 'memory' or 'redis'
     
     # Web
     WEB_HOST = os.getenv('WEB_HOST', '0.0.0.0')
@@ -32,6 +36,16 @@ class Config:
     ENCRYPTION_KEY = os.getenv('ENCRYPTION_KEY')
     RATE_LIMIT = int(os.getenv('RATE_LIMIT_PER_MINUTE', '60'))
     
+    # IDs (unset leases a worker from Redis at startup)
+    ID_WORKER_ID = int(os.getenv('ID_WORKER_ID')) if os.getenv('ID_WORKER_ID') else None
+    
+    # Sharding (set per process by cluster.py; 0 shards lets Discord decide)
+    SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0'))
+    SHARD_IDS = [int(i) for i in os.getenv('SHARD_IDS', '').split(',') if i.strip()]
+    CLUSTER_ID = int(os.getenv('CLUSTER_ID', '0'))
+    CLUSTER_COUNT = int(os.getenv('CLUSTER_COUNT', '1'))
+    CLUSTER_IPC_TIMEOUT = float(os.getenv('CLUSTER_IPC_TIMEOUT', '1.0'))
+    
     # Ticket System
     TICKET_CATEGORY = int(os.getenv('TICKET_CATEGORY', '0'))
     SUPPORT_ROLE = int(os.getenv('SUPPORT_ROLE', '0'))
@@ -39,11 +53,27 @@ class Config:
     CLIENT_ROLE = int(os.getenv('CLIENT_ROLE', '0'))
     ORDERLIST_CHANNEL = int(os.getenv('ORDERLIST_CHANNEL', '0'))
     ORDERLOGS_CHANNEL = int(os.getenv('ORDERLOGS_CHANNEL', '0'))
+    LOG_DISPATCH_QUEUE_SIZE = int(os.getenv('LOG_DISPATCH_QUEUE_SIZE', '1000'))
+    TICKET_POOL_SIZE = int(os.getenv('TICKET_POOL_SIZE', '0'))  # 0 disables the warm channel pool
+    TICKET_POOL_REFILL_SECONDS = float(os.getenv('TICKET_POOL_REFILL_SECONDS', '2'))
+    TICKET_STALE_HOURS = int(os.getenv('TICKET_STALE_HOURS', '48'))
+    TICKET_ARCHIVE_CONCURRENCY = int(os.getenv('TICKET_ARCHIVE_CONCURRENCY', '4'))
+    TICKET_ARCHIVE_REQUESTS_PER_SECOND = int(os.getenv('TICKET_ARCHIVE_REQUESTS_PER_SECOND', '10'))
     
     # Vouch System
     ALLOWED_CHANNEL_IDS = [int(x.strip()) for x in os.getenv('ALLOWED_CHANNEL_IDS', '').split(',') if x.strip()]
     VOUCH_COOLDOWN_SECONDS = int(os.getenv('VOUCH_COOLDOWN_SECONDS', '600'))
+    VOUCH_COMMAND_COOLDOWN_SECONDS = int(os.getenv('VOUCH_COMMAND_COOLDOWN_SECONDS', '2'))
+    VOUCH_COOLDOWN_MAX_KEYS = int(os.getenv('VOUCH_COOLDOWN_MAX_KEYS', '100000'))
     VOUCH_LOG_CHANNEL = int(os.getenv('VOUCH_LOG_CHANNEL', '0'))
+    VOUCH_STATS_TTL_SECONDS = int(os.getenv('VOUCH_STATS_TTL_SECONDS', '300'))
+    VOUCH_STATS_TOP_N = int(os.getenv('VOUCH_STATS_TOP_N', '5'))
+    VOUCH_STATS_DAYS = int(os.getenv('VOUCH_STATS_DAYS', '30'))
+    
+    # User Resolution
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '5000'))
+    USER_CACHE_TTL_SECONDS = int(os.getenv('USER_CACHE_TTL_SECONDS', '3600'))
+    USER_FETCH_CONCURRENCY = int(os.getenv('USER_FETCH_CONCURRENCY', '5'))
     
     # APIs
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
@@ -63,11 +93,29 @@ class Config:
     }
     
     # Staff Payments
+    # Seed directory for guilds that have not stored their own yet
     STAFF_PAYMENTS = json.loads(os.getenv('STAFF_PAYMENTS', '{}'))
+    STAFF_QR_CHANNEL = int(os.getenv('STAFF_QR_CHANNEL', '0'))  # Private channel holding uploaded QR codes
+    STAFF_DIRECTORY_POLL_SECONDS = float(os.getenv('STAFF_DIRECTORY_POLL_SECONDS', '5'))
+    
+    # Logging
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # 'json' or 'text' for the log file
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN', 'midnight')
+    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '14'))
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', 'bot.commands=0.1')  # logger=fraction kept below WARNING
+    
+    # Metrics (each cluster serves on METRICS_PORT + CLUSTER_ID; 0 disables the endpoint)
+    METRICS_HOST = os.getenv('METRICS_HOST', '0.0.0.0')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+    LOOP_LAG_INTERVAL = float(os.getenv('LOOP_LAG_INTERVAL', '0.5'))
     
     # Paths
     DATA_PATH = os.path.join(os.path.dirname(__file__), '../../data')
     LOG_PATH = os.path.join(os.path.dirname(__file__), '../../logs')
+    TRANSCRIPT_PATH = os.path.join(DATA_PATH, 'transcripts')
     
     @classmethod
     def validate(cls) -> bool:
@@ -82,6 +130,7 @@ class Config:
         # Create directories
         os.makedirs(cls.DATA_PATH, exist_ok=True)
         os.makedirs(cls.LOG_PATH, exist_ok=True)
+        os.makedirs(cls.TRANSCRIPT_PATH, exist_ok=True)
         
         return True
 
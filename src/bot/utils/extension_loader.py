@@ -0,0 +1,108 @@
+import asyncio
+import importlib
+import importlib.util
+import logging
+import time
+from typing import Dict, List, Optional
+
+from discord.ext import commands
+
+logger = logging.getLogger(__name__)
+
+class ExtensionResult:
+    """Outcome and timings of loading one extension"""
+    
+    __slots__ = ("name", "status", "import_seconds", "setup_seconds", "error")
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "pending"
+        self.import_seconds = 0.0
+        self.setup_seconds = 0.0
+        self.error: Optional[BaseException] = None
+
+def _module_exists(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        # A missing parent package
+        return False
+
+class ExtensionLoader:
+    """Load extensions concurrently and time each step
+    
+    Missing modules are detected with ``find_spec`` and skipped without
+    importing anything. The remaining extensions are imported in worker
+    threads side by side, which also pulls their dependencies into
+    ``sys.modules``, and then set up concurrently on the event loop.
+    ``load_extension`` re-executes each extension module itself, which is
+    cheap once its dependencies are cached, so the import column mostly
+    measures dependencies and the setup column the cog itself.
+    """
+    
+    def __init__(self, bot: commands.Bot, extensions: List[str], timeout: float = 60.0):
+        self.bot = bot
+        self.extensions = extensions
+        self.timeout = timeout
+        self.results: Dict[str, ExtensionResult] = {name: ExtensionResult(name) for name in extensions}
+        self.total_seconds = 0.0
+    
+    def _timed_out(self, result: ExtensionResult, phase: str):
+        result.status = "timed out"
+        result.error = asyncio.TimeoutError(f"{result.name} {phase} did not finish within {self.timeout:.0f}s")
+    
+    async def _import(self, result: ExtensionResult):
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.to_thread(importlib.import_module, result.name), self.timeout)
+        except asyncio.TimeoutError:
+            self._timed_out(result, "import")
+        except Exception as e:
+            result.status = "import failed"
+            result.error = e
+        finally:
+            result.import_seconds = time.perf_counter() - start
+    
+    async def _setup(self, result: ExtensionResult):
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.bot.load_extension(result.name), self.timeout)
+            result.status = "loaded"
+        except asyncio.TimeoutError:
+            self._timed_out(result, "setup")
+        except Exception as e:
+            result.status = "setup failed"
+            result.error = e
+        finally:
+            result.setup_seconds = time.perf_counter() - start
+    
+    async def load_all(self) -> List[ExtensionResult]:
+        """Load every extension, returning one result per extension"""
+        start = time.perf_counter()
+        
+        present = []
+        for name in self.extensions:
+            if _module_exists(name):
+                present.append(self.results[name])
+            else:
+                self.results[name].status = "missing"
+        
+        # Each step has its own timeout, so one slow extension only fails itself
+        await asyncio.gather(*(self._import(r) for r in present))
+        importable = [r for r in present if r.status == "pending"]
+        await asyncio.gather(*(self._setup(r) for r in importable))
+        
+        self.total_seconds = time.perf_counter() - start
+        return list(self.results.values())
+    
+    def report(self) -> str:
+        """Per-extension timing table"""
+        lines = [f"{'extension':<24} {'status':<13} {'import':>8} {'setup':>8}"]
+        for result in self.results.values():
+            lines.append(
+                f"{result.name:<24} {result.status:<13} "
+                f"{result.import_seconds * 1000:>6.0f}ms {result.setup_seconds * 1000:>6.0f}ms"
+            )
+        loaded = sum(1 for result in self.results.values() if result.status == "loaded")
+        lines.append(f"Loaded {loaded}/{len(self.results)} extensions in {self.total_seconds * 1000:.0f}ms")
+        return "\n".join(lines)
\ No newline at end of file
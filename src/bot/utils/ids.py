@@ -0,0 +1,146 @@
+import logging
+import os
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from .config import config
+from .redis_client import get_redis
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:
+    RedisError = OSError
+
+logger = logging.getLogger(__name__)
+
+# Custom epoch (2024-01-01T00:00:00Z) in milliseconds
+EPOCH_MS = 1704067200000
+
+TIMESTAMP_BITS = 42
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# Crockford base32: no I, L, O or U, and no characters used as custom_id separators
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+ENCODED_LENGTH = 13
+
+# Redis counter handing out worker IDs to processes started without ID_WORKER_ID
+WORKER_COUNTER_KEY = "ids:worker"
+
+TICKET_PREFIXES = {
+    "shop": "T-",
+    "mm": "MM-",
+}
+
+def encode(value: int) -> str:
+    """Encode a 64-bit integer as fixed-width base32 so IDs sort lexicographically"""
+    chars = []
+    for _ in range(ENCODED_LENGTH):
+        value, remainder = divmod(value, 32)
+        chars.append(ALPHABET[remainder])
+    return ''.join(reversed(chars))
+
+def decode(encoded: str) -> int:
+    """Decode a base32 ID body back to its integer"""
+    value = 0
+    for char in encoded:
+        value = value * 32 + ALPHABET.index(char)
+    return value
+
+class IdGenerator:
+    """Snowflake-style IDs: 42-bit millisecond time, 10-bit worker, 12-bit sequence
+    
+    IDs are generated locally without coordination, increase monotonically per
+    worker even if the wall clock steps back, and sort by creation time.
+    Without a worker ID, generating raises until ``assign_worker`` is called.
+    """
+    
+    def __init__(self, worker_id: Optional[int] = None):
+        self.worker_id = None
+        if worker_id is not None:
+            self.assign_worker(worker_id)
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+    
+    def assign_worker(self, worker_id: int):
+        if not 0 <= worker_id <= MAX_WORKER:
+            raise ValueError(f"Worker ID must be between 0 and {MAX_WORKER}")
+        self.worker_id = worker_id
+    
+    def next_int(self) -> int:
+        """Generate the next ID as an integer"""
+        if self.worker_id is None:
+            raise RuntimeError("No ID worker assigned; set ID_WORKER_ID or await claim_worker_id() at startup")
+        with self._lock:
+            now_ms = max(int(time.time() * 1000) - EPOCH_MS, self._last_ms)
+            
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Sequence exhausted for this millisecond, borrow the next one
+                    now_ms += 1
+            else:
+                self._sequence = 0
+            
+            self._last_ms = now_ms
+            return (now_ms << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS) | self._sequence
+    
+    def next_id(self, prefix: str = "") -> str:
+        """Generate the next ID as a prefixed, sortable string"""
+        return f"{prefix}{encode(self.next_int())}"
+    
+    def next_ticket_id(self, ticket_type: str) -> str:
+        """Generate a ticket ID carrying the prefix for its type"""
+        return self.next_id(TICKET_PREFIXES.get(ticket_type, "T-"))
+
+def id_floor(moment: datetime, prefix: str = "") -> str:
+    """Smallest ID that can be generated at or after a moment, for range scans"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    ms = max(int(moment.timestamp() * 1000) - EPOCH_MS, 0)
+    return f"{prefix}{encode(ms << (WORKER_BITS + SEQUENCE_BITS))}"
+
+def id_created_at(generated_id: str) -> datetime:
+    """Recover the creation time embedded in an ID"""
+    value = decode(generated_id[-ENCODED_LENGTH:])
+    ms = (value >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).replace(tzinfo=None)
+
+async def claim_worker_id() -> int:
+    """Give the global generator a worker ID unless ID_WORKER_ID already did
+    
+    Processes take IDs from a shared Redis counter, so a bot and an ad-hoc
+    script get different ones (the counter wraps after 1024 claims). Without Redis, multi-process mode fails
+    fast; a lone process falls back to a random ID.
+    """
+    if ids.worker_id is not None:
+        return ids.worker_id
+    
+    worker_id = None
+    redis = get_redis()
+    if redis is not None:
+        try:
+            worker_id = (await redis.incr(WORKER_COUNTER_KEY) - 1) % (MAX_WORKER + 1)
+        except (RedisError, OSError) as e:
+            logger.warning(f"Could not lease an ID worker from Redis: {e}")
+    
+    if worker_id is None:
+        if config.CLUSTER_COUNT > 1:
+            raise RuntimeError("ID_WORKER_ID is unset and no worker ID could be leased from Redis")
+        worker_id = secrets.randbelow(MAX_WORKER + 1)
+        logger.warning(f"Using random ID worker {worker_id}; set ID_WORKER_ID when running more than one process")
+    
+    ids.assign_worker(worker_id)
+    # Modules imported later under another package path read the same worker from the environment
+    os.environ["ID_WORKER_ID"] = str(worker_id)
+    logger.info(f"Generating IDs as worker {worker_id}")
+    return worker_id
+
+# Global ID generator instance; without ID_WORKER_ID the worker is claimed at startup
+ids = IdGenerator(config.ID_WORKER_ID)
\ No newline at end of file
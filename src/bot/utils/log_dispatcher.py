@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import discord
+
+from .ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Discord accepts at most 10 embeds per message, totalling at most 6000 characters
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+class LogDispatcher:
+    """Write-behind delivery of log embeds to Discord channels
+    
+    Commands enqueue embeds and return immediately. A background task drains
+    the queue, coalesces queued embeds for the same channel into messages of up
+    to 10 embeds and 6000 characters, and paces each channel with its own
+    token bucket while sending to different channels concurrently.
+    """
+    
+    def __init__(self, bot, max_queue: int = 1000, channel_rate: int = 5, channel_per: float = 5.0):
+        self.bot = bot
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.channel_rate = channel_rate
+        self.channel_per = channel_per
+        self.buckets: Dict[int, TokenBucket] = {}
+        self.dropped = 0
+        self.sent_messages = 0
+        self.sent_embeds = 0
+        self._task = None
+        self._closing = False
+    
+    def start(self):
+        """Start the background sender"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    def enqueue(self, channel_id: int, embed: discord.Embed) -> bool:
+        """Queue an embed for a log channel without waiting for delivery"""
+        if not channel_id or self._closing:
+            return False
+        
+        try:
+            self.queue.put_nowait((channel_id, embed))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Log queue full, dropped embed for channel {channel_id} ({self.dropped} dropped)")
+            return False
+    
+    def _drain(self, first: Tuple[int, discord.Embed]) -> "OrderedDict[int, List[discord.Embed]]":
+        """Group the first item and everything else already queued by channel"""
+        pending = OrderedDict()
+        channel_id, embed = first
+        pending.setdefault(channel_id, []).append(embed)
+        
+        while not self.queue.empty():
+            channel_id, embed = self.queue.get_nowait()
+            pending.setdefault(channel_id, []).append(embed)
+        return pending
+    
+    @staticmethod
+    def _chunks(embeds: List[discord.Embed]) -> List[List[discord.Embed]]:
+        """Split embeds into messages within both the count and character limits"""
+        chunks, chunk, chars = [], [], 0
+        for embed in embeds:
+            size = len(embed)
+            if chunk and (len(chunk) == MAX_EMBEDS_PER_MESSAGE or chars + size > MAX_EMBED_CHARS_PER_MESSAGE):
+                chunks.append(chunk)
+                chunk, chars = [], 0
+            chunk.append(embed)
+            chars += size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+    
+    async def _deliver(self, channel, bucket: TokenBucket, channel_id: int, chunk: List[discord.Embed]):
+        await bucket.acquire()
+        try:
+            await channel.send(embeds=chunk)
+            self.sent_messages += 1
+            self.sent_embeds += len(chunk)
+        except discord.HTTPException as e:
+            if e.status == 400 and len(chunk) > 1:
+                # Rejected as a whole; resend one by one so only the offending embed is lost
+                logger.warning(f"Log message to {channel_id} rejected ({e}), retrying {len(chunk)} embeds individually")
+                for embed in chunk:
+                    await self._deliver(channel, bucket, channel_id, [embed])
+            else:
+                logger.error(f"Failed to deliver {len(chunk)} log embeds to {channel_id}: {e}")
+    
+    async def _send(self, channel_id: int, embeds: List[discord.Embed]):
+        """Deliver embeds to one channel in messages of up to 10 embeds and 6000 characters"""
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            try:
+                channel = await self.bot.fetch_channel(channel_id)
+            except discord.HTTPException as e:
+                logger.error(f"Log channel {channel_id} unavailable, dropped {len(embeds)} embeds: {e}")
+                return
+        
+        bucket = self.buckets.get(channel_id)
+        if bucket is None:
+            bucket = self.buckets[channel_id] = TokenBucket(self.channel_rate, self.channel_per)
+        
+        for chunk in self._chunks(embeds):
+            await self._deliver(channel, bucket, channel_id, chunk)
+    
+    async def _run(self):
+        while True:
+            pending = self._drain(await self.queue.get())
+            try:
+                # Channels are sent side by side so one throttled channel doesn't hold up the rest
+                results = await asyncio.gather(
+                    *(self._send(channel_id, embeds) for channel_id, embeds in pending.items()),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.error(f"Log dispatcher error: {result}")
+            finally:
+                for _ in range(sum(len(embeds) for embeds in pending.values())):
+                    self.queue.task_done()
+    
+    async def close(self, timeout: float = 10.0):
+        """Stop accepting embeds and deliver everything still queued"""
+        self._closing = True
+        if self._task is None:
+            return
+        
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Log dispatcher closed with {self.queue.qsize()} embeds undelivered")
+        
+        self._task.cancel()
+        self._task = None
\ No newline at end of file
@@ -0,0 +1,156 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Dict
+
+from .config import config
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra`` fields kept as keys"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of sub-WARNING records from chosen loggers
+    
+    ``rates`` maps a logger name to the fraction kept. A name also covers
+    its child loggers, and the most specific name wins.
+    """
+    
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+    
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate, probe = 1.0, name
+            while probe:
+                if probe in self.rates:
+                    rate = self.rates[probe]
+                    break
+                probe = probe.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+class RotatingTimedFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """Rotate on the configured schedule or once the file passes ``max_bytes``"""
+    
+    def __init__(self, filename: str, max_bytes: int, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.max_bytes = max_bytes
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes > 0 and self.stream is not None:
+            return self.stream.tell() >= self.max_bytes
+        return False
+    
+    def rotation_filename(self, default_name: str) -> str:
+        # Size rollovers can land inside the same time bucket; never overwrite
+        name, n = default_name, 1
+        while os.path.exists(name):
+            name = f"{default_name}.{n}"
+            n += 1
+        return name
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render message and traceback on the caller's side, but keep them
+        # apart so the writer can still emit the traceback as its own field
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse ``name=rate,name=rate`` into a dict"""
+    rates = {}
+    for part in spec.split(","):
+        name, _, rate = part.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+def setup_logging(filename: str) -> logging.handlers.QueueListener:
+    """Route all logging through a queue drained by a background writer thread
+    
+    Loggers only format and enqueue, so the event loop never waits on disk or
+    stdout. The caller must ``stop()`` the returned listener on shutdown to
+    flush what is still queued.
+    """
+    os.makedirs(config.LOG_PATH, exist_ok=True)
+    
+    file_handler = RotatingTimedFileHandler(
+        os.path.join(config.LOG_PATH, filename),
+        max_bytes=config.LOG_MAX_BYTES,
+        when=config.LOG_ROTATE_WHEN,
+        backupCount=config.LOG_BACKUP_COUNT,
+        encoding="utf-8",
+        utc=True
+    )
+    file_handler.setFormatter(JsonFormatter() if config.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=config.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(config.LOG_SAMPLE_RATES)))
+    
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, config.LOG_LEVEL.upper(), logging.INFO))
+    
+    listener = logging.handlers.QueueListener(
+        queue_handler.queue, file_handler, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    return listener
\ No newline at end of file
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Set, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def member_keys(member: discord.Member) -> Set[str]:
+    """Every lowercased name a member can be searched by"""
+    names = {member.name, member.display_name, str(member)}
+    if getattr(member, 'global_name', None):
+        names.add(member.global_name)
+    return {name.lower() for name in names if name}
+
+class GuildMemberIndex:
+    """Name lookups over one guild's members
+    
+    Exact names (username, display name, global name, tag) are hash lookups.
+    Substrings of three or more characters intersect trigram posting sets, and
+    shorter terms fall back to a prefix search over the sorted keys.
+    """
+    
+    def __init__(self):
+        self.exact: Dict[str, Set[int]] = {}
+        self.trigrams: Dict[str, Set[int]] = {}
+        self.sorted_keys: List[Tuple[str, int]] = []
+        self.keys_by_member: Dict[int, Set[str]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.keys_by_member)
+    
+    def add(self, member: discord.Member, keep_sorted: bool = True):
+        """Index a member, replacing any previous entry
+        
+        Bulk loads pass ``keep_sorted=False`` and call ``sort`` once at the
+        end instead of paying for an insort per key.
+        """
+        self.remove(member.id)
+        keys = member_keys(member)
+        self.keys_by_member[member.id] = keys
+        
+        for key in keys:
+            self.exact.setdefault(key, set()).add(member.id)
+            if keep_sorted:
+                insort(self.sorted_keys, (key, member.id))
+            else:
+                self.sorted_keys.append((key, member.id))
+            for trigram in _trigrams(key):
+                self.trigrams.setdefault(trigram, set()).add(member.id)
+    
+    def sort(self):
+        """Restore name order after unsorted adds"""
+        self.sorted_keys.sort()
+    
+    def remove(self, member_id: int):
+        """Drop a member from the index"""
+        keys = self.keys_by_member.pop(member_id, None)
+        if not keys:
+            return
+        
+        for key in keys:
+            self._discard(self.exact, key, member_id)
+            index = bisect_left(self.sorted_keys, (key, member_id))
+            if index < len(self.sorted_keys) and self.sorted_keys[index] == (key, member_id):
+                del self.sorted_keys[index]
+            for trigram in _trigrams(key):
+                self._discard(self.trigrams, trigram, member_id)
+    
+    @staticmethod
+    def _discard(postings: Dict[str, Set[int]], key: str, member_id: int):
+        members = postings.get(key)
+        if members is not None:
+            members.discard(member_id)
+            if not members:
+                del postings[key]
+    
+    def find_exact(self, term: str) -> Set[int]:
+        """Members whose name, display name, global name or tag equals the term"""
+        return set(self.exact.get(term.lower(), ()))
+    
+    def find_prefix(self, term: str, limit: int = 25) -> List[int]:
+        """Members with a name starting with the term, in name order"""
+        term = term.lower()
+        found = []
+        index = bisect_left(self.sorted_keys, (term, -1))
+        while index < len(self.sorted_keys) and len(found) < limit:
+            key, member_id = self.sorted_keys[index]
+            if not key.startswith(term):
+                break
+            if member_id not in found:
+                found.append(member_id)
+            index += 1
+        return found
+    
+    def find_substring(self, term: str, limit: int = 25) -> List[int]:
+        """Members with a name containing the term, best (shortest) match first"""
+        term = term.lower()
+        if len(term) < 3:
+            return self.find_prefix(term, limit)
+        
+        postings = [self.trigrams.get(trigram) for trigram in _trigrams(term)]
+        if not all(postings):
+            return []
+        
+        candidates = set.intersection(*sorted(postings, key=len))
+        matches = []
+        for member_id in candidates:
+            lengths = [len(key) for key in self.keys_by_member[member_id] if term in key]
+            if lengths:
+                matches.append((min(lengths), member_id))
+        return [member_id for _, member_id in sorted(matches)[:limit]]
+
+class MemberIndex:
+    """Per-guild member name indexes fed by the gateway member cache and events"""
+    
+    def __init__(self):
+        self.guilds: Dict[int, GuildMemberIndex] = {}
+    
+    async def build(self, guild: discord.Guild, chunk_size: int = 1000):
+        """Index every cached member of a guild, yielding to the loop between chunks"""
+        index = GuildMemberIndex()
+        for position, member in enumerate(list(guild.members), start=1):
+            index.add(member, keep_sorted=False)
+            if position % chunk_size == 0:
+                await asyncio.sleep(0)
+        index.sort()
+        
+        self.guilds[guild.id] = index
+        logger.info(f"Indexed {len(index)} members of {guild.name}")
+    
+    def drop(self, guild_id: int):
+        """Forget a guild's index"""
+        self.guilds.pop(guild_id, None)
+    
+    def add(self, member: discord.Member):
+        """Index a joined or updated member"""
+        index = self.guilds.get(member.guild.id)
+        if index is not None:
+            index.add(member)
+    
+    def remove(self, guild_id: int, member_id: int):
+        """Drop a member who left a guild"""
+        index = self.guilds.get(guild_id)
+        if index is not None:
+            index.remove(member_id)
+    
+    def is_ready(self, guild_id: int) -> bool:
+        """Whether a guild has been indexed"""
+        return guild_id in self.guilds
+    
+    def find(self, guild: discord.Guild, term: str) -> Optional[discord.Member]:
+        """Find a member by exact name first, then by the best partial match"""
+        index = self.guilds.get(guild.id)
+        term = term.lower().strip()
+        if index is None or not term:
+            return None
+        
+        exact = sorted(index.find_exact(term))
+        candidates = exact or index.find_substring(term, limit=5)
+        for member_id in candidates:
+            member = guild.get_member(member_id)
+            if member is not None:
+                return member
+        return None
\ No newline at end of file
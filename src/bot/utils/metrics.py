@@ -0,0 +1,319 @@
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import discord
+from aiohttp import web
+from discord import app_commands
+from pymongo import monitoring
+
+from .log_setup import DroppingQueueHandler
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans a fast cache hit up to a slow Discord round trip
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _render_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{k}="{_escape(v)}"' for k, v in labels)
+    return "{" + ",".join(escaped) + "}"
+
+class Counter:
+    """Monotonic count per label set"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+    
+    def samples(self) -> Iterable[Tuple[str, Labels, float]]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in self.values.items()]
+
+class Gauge(Counter):
+    """Last value per label set"""
+    
+    kind = "gauge"
+    
+    def set(self, value: float, **labels):
+        with self._lock:
+            self.values[_labels(labels)] = value
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set"""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.values: Dict[Labels, List[float]] = {}  # bucket counts, then sum
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += value
+    
+    def series(self) -> Dict[Labels, Tuple[List[int], float]]:
+        """Cumulative counts per bucket (the last one is +Inf) and the sum"""
+        with self._lock:
+            snapshot = {key: list(state) for key, state in self.values.items()}
+        result = {}
+        for key, state in snapshot.items():
+            cumulative, total = [], 0
+            for count in state[:-1]:
+                total += count
+                cumulative.append(total)
+            result[key] = (cumulative, state[-1])
+        return result
+    
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation"""
+        entry = self.series().get(_labels(labels))
+        if entry is None or not entry[0][-1]:
+            return None
+        cumulative = entry[0]
+        rank = q * cumulative[-1]
+        for bound, count in zip(self.buckets + (float("inf"),), cumulative):
+            if count >= rank:
+                return bound
+        return float("inf")
+    
+    def top(self, n: int = 5) -> List[Tuple[Dict[str, str], int, Optional[float], Optional[float]]]:
+        """Busiest label sets as (labels, count, p50, p95)"""
+        series = sorted(self.series().items(), key=lambda item: item[1][0][-1], reverse=True)[:n]
+        return [
+            (dict(key), cumulative[-1], self.quantile(0.5, **dict(key)), self.quantile(0.95, **dict(key)))
+            for key, (cumulative, _) in series
+        ]
+    
+    def samples(self) -> Iterable[Tuple[str, Labels, float]]:
+        for key, (cumulative, total) in self.series().items():
+            for bound, count in zip(self.buckets + (float("inf"),), cumulative):
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket", key + (("le", le),), count
+            yield f"{self.name}_sum", key, total
+            yield f"{self.name}_count", key, cumulative[-1]
+
+class MetricsRegistry:
+    """Named metric families plus collectors that refresh gauges at scrape time"""
+    
+    def __init__(self):
+        self.families: Dict[str, object] = {}
+        self.collectors: List[Callable[[], None]] = []
+    
+    def _family(self, cls, name: str, help: str, **kwargs):
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = cls(name, help, **kwargs)
+        return family
+    
+    def counter(self, name: str, help: str) -> Counter:
+        return self._family(Counter, name, help)
+    
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._family(Gauge, name, help)
+    
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._family(Histogram, name, help, buckets=buckets)
+    
+    def add_collector(self, collector: Callable[[], None]):
+        self.collectors.append(collector)
+    
+    def collect(self):
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}")
+    
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        self.collect()
+        
+        lines = []
+        for family in self.families.values():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for name, labels, value in family.samples():
+                lines.append(f"{name}{_render_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+    
+    def summary(self) -> Dict[str, object]:
+        """The headline numbers for the /metrics command"""
+        self.collect()
+        return {
+            "loop_lag": (LOOP_LAG.quantile(0.5), LOOP_LAG.quantile(0.99)),
+            "heartbeat": {int(dict(key)["shard"]): value for _, key, value in HEARTBEAT.samples()},
+            "commands": COMMAND_LATENCY.top(5),
+            "mongo": MONGO_LATENCY.top(5),
+            "rate_limits": {dict(key)["scope"]: int(value) for _, key, value in RATE_LIMITS.samples()},
+            "log_dropped": int(sum(value for _, _, value in LOG_DROPPED.samples())),
+        }
+
+metrics = MetricsRegistry()
+
+COMMAND_LATENCY = metrics.histogram("bot_app_command_seconds", "Slash command handling time")
+LOOP_LAG = metrics.histogram("bot_event_loop_lag_seconds", "Delay of a scheduled wakeup on the event loop")
+HEARTBEAT = metrics.gauge("bot_gateway_heartbeat_seconds", "Gateway heartbeat round trip per shard")
+MONGO_LATENCY = metrics.histogram("bot_mongo_command_seconds", "MongoDB command duration")
+RATE_LIMITS = metrics.counter("bot_discord_rate_limits_total", "Discord REST 429 responses")
+LOG_DROPPED = metrics.gauge("bot_log_records_dropped", "Log records dropped because the log queue was full")
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Time every MongoDB command by name
+    
+    pymongo calls these from whichever thread ran the operation, so the
+    histogram is lock protected.
+    """
+    
+    def started(self, event):
+        pass
+    
+    def succeeded(self, event):
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, command=event.command_name, status="ok")
+    
+    def failed(self, event):
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, command=event.command_name, status="error")
+
+class RateLimitCounter(logging.Filter):
+    """Count 429s from the warnings discord.py's HTTP client logs for them
+    
+    discord.py retries rate limited requests itself and only reports them
+    through ``discord.http``, so this sits on that logger as a filter that
+    never drops anything.
+    """
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            message = str(record.msg)
+            if "responded with 429" in message:
+                RATE_LIMITS.inc(scope="route")
+            elif "Global rate limit" in message:
+                RATE_LIMITS.inc(scope="global")
+        return True
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """Command tree that times every slash and context menu command"""
+    
+    async def _call(self, interaction: discord.Interaction):
+        if interaction.type is discord.InteractionType.autocomplete:
+            return await super()._call(interaction)
+        
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            await super()._call(interaction)
+            if interaction.command_failed:
+                status = "error"
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            command = interaction.command
+            name = command.qualified_name if command is not None else "unknown"
+            COMMAND_LATENCY.observe(time.perf_counter() - start, command=name, status=status)
+
+class LoopLagSampler:
+    """Measure how late the event loop wakes a sleeping task"""
+    
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task = None
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, loop.time() - expected)
+            LOOP_LAG.observe(self.last_lag)
+
+def instrument_bot(bot):
+    """Publish the bot's own counters and heartbeat on every scrape
+    
+    Also sets ``bot.metrics`` so extensions reach this registry without
+    importing the module under a second name.
+    """
+    bot.metrics = metrics
+    messages = metrics.gauge("bot_messages_processed", "Messages seen by on_message")
+    commands_used = metrics.gauge("bot_prefix_commands_used", "Prefix commands invoked")
+    guilds = metrics.gauge("bot_guilds", "Guilds on this process's shards")
+    
+    def collect():
+        messages.set(bot.messages_processed)
+        commands_used.set(bot.commands_used)
+        guilds.set(len(bot.guilds))
+        for shard_id, latency in bot.latencies:
+            # latency is inf until the first heartbeat ack
+            if latency != float("inf"):
+                HEARTBEAT.set(latency, shard=shard_id)
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, DroppingQueueHandler):
+                LOG_DROPPED.set(handler.dropped)
+    
+    metrics.add_collector(collect)
+    logging.getLogger("discord.http").addFilter(RateLimitCounter())
+
+
+class MetricsServer:
+    """Serve ``GET /metrics`` in Prometheus text format"""
+    
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._runner = None
+    
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+    
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Metrics endpoint listening on {self.host}:{self.port}")
+    
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
\ No newline at end of file
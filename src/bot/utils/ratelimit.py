@@ -0,0 +1,164 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+import logging
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from .config import config
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+class CooldownBucket:
+    """In-process cooldowns keyed by any hashable key
+    
+    Timing uses the monotonic clock. Expiries sit in a min-heap, so expired
+    keys are evicted lazily from the top on every access whatever durations
+    they were started with. Once ``max_keys`` live keys are held, starting
+    a new one evicts the cooldown closest to expiring.
+    """
+    
+    def __init__(self, seconds: float, max_keys: int = 10000):
+        self.seconds = seconds
+        self.max_keys = max_keys
+        self._expiries: Dict[Hashable, float] = {}
+        # (expiry, sequence, key); entries whose expiry no longer matches _expiries are stale
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._sequence = itertools.count()
+    
+    def __len__(self) -> int:
+        return len(self._expiries)
+    
+    def _evict(self, now: float):
+        """Drop expired keys and stale heap entries from the top of the heap"""
+        while self._heap:
+            expiry, _, key = self._heap[0]
+            if self._expiries.get(key) == expiry and expiry > now:
+                break
+            heapq.heappop(self._heap)
+            if self._expiries.get(key) == expiry:
+                del self._expiries[key]
+    
+    async def remaining(self, key: Hashable) -> Optional[float]:
+        """Get the seconds left on a key's cooldown, or None if it is free"""
+        now = time.monotonic()
+        self._evict(now)
+        
+        expiry = self._expiries.get(key)
+        if expiry is None or expiry <= now:
+            return None
+        return expiry - now
+    
+    async def trigger(self, key: Hashable, seconds: float = None):
+        """Start a cooldown for a key"""
+        now = time.monotonic()
+        self._evict(now)
+        
+        expiry = now + (self.seconds if seconds is None else seconds)
+        self._expiries[key] = expiry
+        heapq.heappush(self._heap, (expiry, next(self._sequence), key))
+        
+        self._compact()
+    
+    def _compact(self):
+        """Re-triggered and reset keys leave stale heap entries behind; rebuild once they dominate"""
+        if len(self._heap) > 2 * max(len(self._expiries), self.max_keys):
+            self._heap = [(expiry, next(self._sequence), key) for key, expiry in self._expiries.items()]
+            heapq.heapify(self._heap)
+    
+    async def acquire(self, key: Hashable) -> Optional[float]:
+        """Start a cooldown unless one is running, returning the seconds left if it is
+        
+        With ``max_keys`` live cooldowns held, the one closest to expiring is
+        dropped to make room.
+        """
+        remaining = await self.remaining(key)
+        if remaining is not None:
+            return remaining
+        
+        # After _evict the heap top is always the soonest live cooldown
+        while len(self._expiries) >= self.max_keys:
+            self._evict(time.monotonic())
+            _, _, soonest = heapq.heappop(self._heap)
+            del self._expiries[soonest]
+        
+        await self.trigger(key)
+        return None
+    
+    async def reset(self, key: Hashable):
+        """Clear a key's cooldown"""
+        self._expiries.pop(key, None)
+        self._compact()
+
+class RedisCooldownBucket:
+    """Cooldowns stored as expiring Redis keys, shared across bot processes"""
+    
+    def __init__(self, redis, name: str, seconds: float):
+        self.redis = redis
+        self.name = name
+        self.seconds = seconds
+    
+    def _key(self, key: Hashable) -> str:
+        if isinstance(key, tuple):
+            key = ':'.join(str(part) for part in key)
+        return f"cooldown:{self.name}:{key}"
+    
+    async def remaining(self, key: Hashable) -> Optional[float]:
+        """Get the seconds left on a key's cooldown, or None if it is free"""
+        ttl = await self.redis.pttl(self._key(key))
+        if ttl <= 0:
+            return None
+        return ttl / 1000
+    
+    async def trigger(self, key: Hashable, seconds: float = None):
+        """Start a cooldown for a key"""
+        seconds = self.seconds if seconds is None else seconds
+        await self.redis.set(self._key(key), 1, px=max(int(seconds * 1000), 1))
+    
+    async def acquire(self, key: Hashable) -> Optional[float]:
+        """Start a cooldown unless one is running, returning the seconds left if it is"""
+        acquired = await self.redis.set(self._key(key), 1, px=max(int(self.seconds * 1000), 1), nx=True)
+        if acquired:
+            return None
+        return await self.remaining(key) or 0.001
+    
+    async def reset(self, key: Hashable):
+        """Clear a key's cooldown"""
+        await self.redis.delete(self._key(key))
+
+class TokenBucket:
+    """Async token bucket allowing ``rate`` acquisitions per ``per`` seconds"""
+    
+    def __init__(self, rate: int, per: float):
+        self.capacity = rate
+        self.fill_rate = rate / per
+        self.tokens = float(rate)
+        self.updated_at = time.monotonic()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.fill_rate)
+        self.updated_at = now
+    
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        while True:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+def create_cooldown(name: str, seconds: float, max_keys: int = 10000):
+    """Create a cooldown bucket on the backend selected by COOLDOWN_BACKEND"""
+    if config.COOLDOWN_BACKEND == 'redis':
+        redis = get_redis()
+        if redis is not None:
+            return RedisCooldownBucket(redis, name, seconds)
+        logger.warning(f"Falling back to in-process cooldowns for {name}")
+    return CooldownBucket(seconds, max_keys)
+
+def format_remaining(seconds: float) -> int:
+    """Round a remaining cooldown up to whole seconds for display"""
+    return max(math.ceil(seconds), 1)
\ No newline at end of file
@@ -0,0 +1,38 @@
+import logging
+from typing import Optional
+
+from .config import config
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+def get_redis() -> Optional["aioredis.Redis"]:
+    """Get the shared Redis client, or None if the redis package is missing"""
+    global _client
+    
+    if aioredis is None:
+        logger.warning("redis package is not installed, Redis backed features are unavailable")
+        return None
+    
+    if _client is None:
+        _client = aioredis.Redis(
+            host=config.REDIS_HOST,
+            port=config.REDIS_PORT,
+            password=config.REDIS_PASSWORD,
+            decode_responses=True
+        )
+    return _client
+
+async def close_redis():
+    """Close the shared Redis client"""
+    global _client
+    
+    if _client is not None:
+        await _client.close()
+        _client = None
\ No newline at end of file
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+import discord
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure, PyMongoError
+
+from .config import config
+from .cluster_ipc import owns_guild
+
+logger = logging.getLogger(__name__)
+
+# Re-sign cached attachment URLs this long before Discord expires them
+URL_REFRESH_MARGIN = 3600
+
+# Names are embedded in button custom_ids and in staffPayments.<name> update paths
+STAFF_NAME_PATTERN = re.compile(r"[A-Za-z0-9-]{1,32}")
+
+# Polling re-reads this far back so small clock differences between writers are not missed
+POLL_OVERLAP = timedelta(seconds=30)
+
+def _url_expires_at(url: str) -> Optional[float]:
+    """Expiry of a signed Discord CDN URL from its hex ``ex`` parameter"""
+    try:
+        return float(int(parse_qs(urlparse(url).query)["ex"][0], 16))
+    except (KeyError, ValueError, IndexError):
+        return None
+
+class StaffDirectory:
+    """Staff payment details per guild, served from memory
+    
+    Entries live on the guild document under ``staffPayments`` and are loaded
+    once at startup. A change stream keeps every process in sync; deployments
+    without a replica set fall back to polling ``staffPaymentsUpdatedAt``.
+    Guilds without a stored directory use the STAFF_PAYMENTS env blob.
+    Under cluster.py only guilds on this process's shards are held.
+    """
+    
+    def __init__(self, bot, db, poll_interval: float = 5.0):
+        self.bot = bot
+        self.db = db
+        self.poll_interval = poll_interval
+        self._entries: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self._last_seen = datetime(1970, 1, 1)
+        self._task = None
+    
+    async def _fetch_since(self, since: datetime):
+        cursor = self.db.guilds.find(
+            {"staffPaymentsUpdatedAt": {"$gt": since}},
+            {"_id": 0, "guildId": 1, "staffPayments": 1, "staffPaymentsUpdatedAt": 1}
+        )
+        async for guild in cursor:
+            self._apply(guild)
+    
+    def _apply(self, guild: Dict[str, Any]):
+        if "staffPayments" not in guild:
+            return
+        updated_at = guild.get("staffPaymentsUpdatedAt")
+        if updated_at and updated_at > self._last_seen:
+            self._last_seen = updated_at
+        guild_id = int(guild["guildId"])
+        if owns_guild(guild_id, config.SHARD_IDS, config.SHARD_COUNT):
+            self._entries[guild_id] = guild["staffPayments"] or {}
+    
+    async def load(self):
+        """Load every stored directory"""
+        await self._fetch_since(self._last_seen)
+        logger.info(f"Loaded staff payment directories for {len(self._entries)} guilds")
+    
+    def start(self):
+        """Start following directory changes made by other processes"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._follow())
+    
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    async def _follow(self):
+        pipeline = [{"$match": {
+            "operationType": {"$in": ["insert", "update", "replace"]},
+            "fullDocument.staffPayments": {"$exists": True}
+        }}]
+        try:
+            async with self.db.guilds.watch(pipeline, full_document="updateLookup") as stream:
+                logger.info("Following staff payment changes with a change stream")
+                async for change in stream:
+                    self._apply(change["fullDocument"])
+        except OperationFailure as e:
+            # Change streams need a replica set
+            logger.info(f"Change streams unavailable ({e.code}), polling staff payments every {self.poll_interval}s")
+        except PyMongoError as e:
+            logger.warning(f"Staff payment change stream stopped: {e}, falling back to polling")
+        
+        await self._poll()
+    
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self._fetch_since(self._last_seen - POLL_OVERLAP)
+            except PyMongoError as e:
+                logger.error(f"Staff payment poll failed: {e}")
+    
+    def _guild_entries(self, guild_id: int) -> Dict[str, Dict[str, Any]]:
+        entries = self._entries.get(guild_id)
+        return entries if entries is not None else config.STAFF_PAYMENTS
+    
+    def get(self, guild_id: int, name: str) -> Optional[Dict[str, Any]]:
+        """Payment details for a staff member, without touching the database"""
+        return self._guild_entries(guild_id).get(name)
+    
+    def names(self, guild_id: int) -> List[str]:
+        return sorted(self._guild_entries(guild_id))
+    
+    async def _write(self, guild_id: int, update: Dict[str, Any]):
+        now = datetime.utcnow()
+        update.setdefault("$set", {})["staffPaymentsUpdatedAt"] = now
+        guild = await self.db.guilds.find_one_and_update(
+            {"guildId": str(guild_id)},
+            update,
+            projection={"_id": 0, "guildId": 1, "staffPayments": 1, "staffPaymentsUpdatedAt": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self._apply(guild)
+    
+    async def set_staff(self, guild_id: int, name: str, number: str, gcash_name: str, qr_message: discord.Message = None):
+        """Add or replace a staff member's payment details
+        
+        ``qr_message`` is a message in the QR storage channel; its attachment
+        URL is cached and re-signed from the message when it nears expiry.
+        """
+        if not STAFF_NAME_PATTERN.fullmatch(name):
+            raise ValueError(f"Invalid staff name: {name!r}")
+        
+        entry = {"number": number, "gcash_name": gcash_name, "qr_code": None}
+        if qr_message is not None and qr_message.attachments:
+            entry["qr_code"] = qr_message.attachments[0].url
+            entry["qr_channel_id"] = qr_message.channel.id
+            entry["qr_message_id"] = qr_message.id
+        elif (existing := self._entries.get(guild_id, {}).get(name)):
+            # Keep the stored QR when only the number or name changes
+            for key in ("qr_code", "qr_channel_id", "qr_message_id"):
+                if existing.get(key):
+                    entry[key] = existing[key]
+        
+        # Seed from the env blob so the first edit doesn't drop the other staff
+        if guild_id not in self._entries and config.STAFF_PAYMENTS:
+            entries = dict(config.STAFF_PAYMENTS)
+            entries[name] = entry
+            await self._write(guild_id, {"$set": {"staffPayments": entries}})
+        else:
+            await self._write(guild_id, {"$set": {f"staffPayments.{name}": entry}})
+    
+    async def remove_staff(self, guild_id: int, name: str) -> bool:
+        """Remove a staff member; False if they were not listed"""
+        entries = self._guild_entries(guild_id)
+        if name not in entries:
+            return False
+        
+        # Seeded keys may not be addressable as a field path; rewrite the whole map for those
+        if guild_id not in self._entries or not STAFF_NAME_PATTERN.fullmatch(name):
+            remaining = {key: value for key, value in entries.items() if key != name}
+            await self._write(guild_id, {"$set": {"staffPayments": remaining}})
+        else:
+            await self._write(guild_id, {"$unset": {f"staffPayments.{name}": ""}})
+        return True
+    
+    async def qr_url(self, guild_id: int, name: str) -> Optional[str]:
+        """Cached QR image URL, re-signed from its storage message if it is about to expire"""
+        entry = self.get(guild_id, name)
+        if not entry or not entry.get("qr_code"):
+            return None
+        
+        url = entry["qr_code"]
+        expires_at = _url_expires_at(url)
+        if expires_at is None or expires_at - time.time() > URL_REFRESH_MARGIN or not entry.get("qr_message_id"):
+            return url
+        
+        try:
+            channel = self.bot.get_channel(entry["qr_channel_id"]) or await self.bot.fetch_channel(entry["qr_channel_id"])
+            message = await channel.fetch_message(entry["qr_message_id"])
+        except discord.HTTPException as e:
+            logger.warning(f"Could not refresh QR code for {name}: {e}")
+            return url
+        
+        if message.attachments:
+            entry["qr_code"] = message.attachments[0].url
+            # Env-seeded guilds have no stored map to patch yet
+            if guild_id in self._entries and STAFF_NAME_PATTERN.fullmatch(name):
+                await self._write(guild_id, {"$set": {f"staffPayments.{name}.qr_code": entry["qr_code"]}})
+        return entry["qr_code"]
\ No newline at end of file
@@ -0,0 +1,88 @@
+import asyncio
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+class UserResolver:
+    """Resolve user IDs to users with as few REST calls as possible
+    
+    Lookups try the gateway cache first, then a TTL/LRU cache of users fetched
+    earlier. Whatever is left is fetched concurrently, bounded by a semaphore.
+    Unknown users are cached too so they are not fetched again until expiry.
+    """
+    
+    def __init__(self, bot, max_size: int = 5000, ttl: float = 3600, concurrency: int = 5):
+        self.bot = bot
+        self.max_size = max_size
+        self.ttl = ttl
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self._cache: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.fetches = 0
+    
+    def _get_cached(self, user_id: int):
+        """Return (found, user) from the gateway cache or the fetched-user cache"""
+        user = self.bot.get_user(user_id)
+        if user is not None:
+            return True, user
+        
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return False, None
+        
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._cache[user_id]
+            return False, None
+        
+        self._cache.move_to_end(user_id)
+        return True, user
+    
+    def _store(self, user_id: int, user: Optional[discord.User]):
+        self._cache[user_id] = (time.monotonic() + self.ttl, user)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+    
+    async def _fetch(self, user_id: int) -> Optional[discord.User]:
+        async with self.semaphore:
+            self.fetches += 1
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                user = None
+            except discord.HTTPException as e:
+                # Transient failure, leave it uncached so the next render retries
+                logger.warning(f"Failed to fetch user {user_id}: {e}")
+                return None
+        
+        self._store(user_id, user)
+        return user
+    
+    async def resolve(self, user_id: int) -> Optional[discord.User]:
+        """Resolve a single user ID"""
+        return (await self.resolve_many([user_id])).get(int(user_id))
+    
+    async def resolve_many(self, user_ids: Iterable[int]) -> Dict[int, Optional[discord.User]]:
+        """Resolve many user IDs, fetching every cache miss concurrently"""
+        resolved = {}
+        misses = []
+        
+        for user_id in dict.fromkeys(int(user_id) for user_id in user_ids):
+            found, user = self._get_cached(user_id)
+            if found:
+                self.hits += 1
+                resolved[user_id] = user
+            else:
+                misses.append(user_id)
+        
+        if misses:
+            users = await asyncio.gather(*(self._fetch(user_id) for user_id in misses))
+            resolved.update(zip(misses, users))
+        
+        return resolved
\ No newline at end of file
@@ -2,6 +2,7 @@ from flask import Flask, render_template, request, jsonify, session, redirect, u
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_cors import CORS
+from pymongo import MongoClient
 import logging
 import os
 import sys
@@ -29,6 +30,9 @@ def create_app():
         default_limits=["200 per day", "50 per hour"]
     )
     
+    # Read-only view of the snapshots the bot writes
+    stats_collection = MongoClient(config.MONGO_URI)[config.MONGO_DB].stats
+    
     # Routes
     @app.route('/')
     def index():
@@ -71,6 +75,19 @@ def create_app():
             'commands': 3421
         })
     
+    @app.route('/api/vouch-stats')
+    @limiter.limit("30 per minute")
+    def api_vouch_stats():
+        if 'user_id' not in session:
+            return jsonify({'error': 'Unauthorized'}), 401
+        
+        snapshot = stats_collection.find_one({"_id": "vouches"}, {"_id": 0})
+        if not snapshot:
+            return jsonify({'error': 'No vouch stats yet'}), 404
+        
+        snapshot['generated_at'] = snapshot['generated_at'].isoformat()
+        return jsonify(snapshot)
+    
     @app.route('/logout')
     def logout():
         session.clear()